@@ -0,0 +1,66 @@
+"""shared fixtures of the benchmark scripts, run the scripts from any directory"""
+
+from cotdantic.templates import default_blue_force
+from cotdantic import Event, Point, Detail, Usericon, Link, Status, Takv, Track
+from typing import Callable
+import timeit
+
+
+def blue_force(uid: str = 'benchmark', padding: int = 0) -> Event:
+	"""the PLI the TUI sends, padding adds a remarks element of that many bytes"""
+	event = default_blue_force(
+		uid=uid,
+		callsign=uid,
+		group_name='Cyan',
+		group_role='Team Member',
+		address='127.0.0.1',
+		lat=38.691420,
+		lon=-77.134600,
+	)
+	if padding:
+		event.detail.raw_xml = f'<remarks>{"x" * padding}</remarks>'.encode()
+	return event
+
+
+def detailed(uid: str = 'benchmark') -> Event:
+	"""PLI with elements that travel in protobuf xml_detail"""
+	event = blue_force(uid)
+	event.detail.usericon = Usericon(iconsetpath='COT_MAPPING_2525C/a-u/a-u-G')
+	event.detail.link = [Link(parent_callsign='DeltaPlatoon', relation='p-l') for _ in range(10)]
+	event.detail.status = Status(battery=50, readiness=True)
+	event.detail.takv = Takv(device='virtual', platform='virtual', os='linux', version='1.0.0')
+	event.detail.track = Track(speed=1.0, course=90.0)
+	event.detail.raw_xml = b'<custom value="1"/>'
+	return event
+
+
+def route(points: int = 200) -> Event:
+	"""route drawing, waypoints are links and the nested navigation cues are unknown raw_xml"""
+	event = Event(
+		uid='benchmark-route',
+		type='b-m-r',
+		how='h-e',
+		point=Point(lat=38.6, lon=-77.1),
+		detail=Detail(),
+	)
+	event.detail.link = [
+		Link(
+			uid=f'wp-{i}',
+			callsign=f'CP{i}',
+			type='b-m-p-c',
+			point=f'{38.6 + i * 1e-4},{-77.1 - i * 1e-4}',
+			relation='c',
+		)
+		for i in range(points)
+	]
+	cues = ''.join(
+		f'<__navcue voice="Turn {i}" id="wp-{i}" text="Turn {i}"><trigger mode="r" value="70"/></__navcue>'
+		for i in range(points)
+	)
+	event.detail.raw_xml = f'<__routeinfo><__navcues>{cues}</__navcues></__routeinfo>'.encode()
+	return event
+
+
+def rate(func: Callable[[], object], number: int, repeat: int = 1) -> float:
+	"""calls/sec of func, best of repeat"""
+	return number / min(timeit.repeat(func, number=number, repeat=repeat))
@@ -0,0 +1,42 @@
+"""Deduplicator keying cost per packet against decoding the packet"""
+
+from cotdantic.multicast import Deduplicator, DedupKey
+from cotdantic.converters import parse_cot
+from common import blue_force
+import timeit
+
+
+def packets(size: int):
+	for i in range(size):
+		event = blue_force(f'benchmark-{i}')
+		yield event.to_xml()
+		yield event.to_bytes()
+
+
+def main():
+	import argparse
+
+	parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+	parser.add_argument(
+		'--size', type=int, default=2000, help='distinct events, each sent as xml and protobuf'
+	)
+	parser.add_argument('--copies', type=int, default=3, help='paths delivering every packet')
+	args = parser.parse_args()
+
+	data = list(packets(args.size)) * args.copies
+
+	seconds = timeit.timeit(
+		lambda: [parse_cot(packet) for packet in data[: len(data) // args.copies]], number=1
+	)
+	print(f'   parse: {len(data) / args.copies / seconds:9.0f} packets/sec')
+
+	for key in DedupKey:
+		deduplicator = Deduplicator(key=key)
+		seconds = timeit.timeit(lambda: [deduplicator.seen(packet) for packet in data], number=1)
+		print(
+			f'{key.value:>8}: {len(data) / seconds:9.0f} packets/sec, hit rate {deduplicator.hit_rate:.2f}'
+		)
+
+
+if __name__ == '__main__':
+	main()
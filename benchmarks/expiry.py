@@ -0,0 +1,46 @@
+"""Contacts stale expiry from the min-heap against scanning every contact"""
+
+from cotdantic.models import epoch2iso, iso2epoch
+from cotdantic.contacts import Contacts
+from common import blue_force
+import random
+import timeit
+import time
+
+
+def scan_expire(contacts: dict, now: int):
+	return [uid for uid, (event, _) in contacts.items() if iso2epoch(event.stale) < now]
+
+
+def main():
+	import argparse
+
+	parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+	parser.add_argument('--size', type=int, default=20000, help='tracked contacts')
+	parser.add_argument(
+		'--ticks', type=int, default=100, help='expiry passes, one per second of stale time'
+	)
+	args = parser.parse_args()
+
+	now = int(time.time() * 1000)
+	contacts = Contacts()
+	for i in range(args.size):
+		event = blue_force(f'uid-{i}')
+		event.stale = epoch2iso(now + 60_000 + random.randint(0, 300_000))
+		contacts.pli_listener(event, ('127.0.0.1', 4242))
+
+	start = now + 60_000
+	snapshot = dict(contacts.contacts)
+	before = timeit.timeit(
+		lambda: [scan_expire(snapshot, start + tick * 1000) for tick in range(args.ticks)], number=1
+	)
+	after = timeit.timeit(
+		lambda: [contacts.expire(start + tick * 1000) for tick in range(args.ticks)], number=1
+	)
+	print(
+		f'  expire: {before / args.ticks * 1000:9.3f} -> {after / args.ticks * 1000:9.3f} ms/pass ({before / after:.1f}x)'
+	)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,51 @@
+"""events/sec of a filtering pipeline, eager parse_cot against LazyEvent
+
+the stream mixes PLIs, detailed PLIs and routes. the filter keeps hostile types and
+reads the contact of the kept events, so only --keep of the details are decoded lazily.
+"""
+
+from cotdantic.converters import parse_cot
+from cotdantic.lazy import LazyEvent
+from common import blue_force, detailed, route, rate
+import random
+
+
+def stream(count: int, keep: float, xml: bool):
+	random.seed(0)
+	builders = [blue_force, detailed, lambda uid: route(50)]
+	packets = []
+	for i in range(count):
+		event = builders[i % len(builders)](f'stream-{i}')
+		event.type = 'a-h-G' if random.random() < keep else 'a-f-G'
+		packets.append(event.to_xml() if xml else event.to_bytes())
+	return packets
+
+
+def pipeline(decode, packets):
+	kept = []
+	for data in packets:
+		event = decode(data)
+		if event is not None and event.type.startswith('a-h'):
+			kept.append(event.detail.contact)
+	return kept
+
+
+def main():
+	import argparse
+
+	parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+	parser.add_argument('--count', type=int, default=300, help='packets in the stream')
+	parser.add_argument(
+		'--keep', type=float, default=0.05, help='fraction of events passing the filter'
+	)
+	args = parser.parse_args()
+
+	for name, xml in (('xml', True), ('protobuf', False)):
+		packets = stream(args.count, args.keep, xml)
+		eager = rate(lambda: pipeline(parse_cot, packets), 1, repeat=3) * len(packets)
+		lazy = rate(lambda: pipeline(LazyEvent.from_cot, packets), 1, repeat=3) * len(packets)
+		print(f'{name:>9}: eager {eager:8.0f} /sec, lazy {lazy:8.0f} /sec, {lazy / eager:5.1f}x')
+
+
+if __name__ == '__main__':
+	main()
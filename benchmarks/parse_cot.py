@@ -0,0 +1,37 @@
+"""packets/sec of parse_cot against the trial-parsing implementation it replaced"""
+
+from cotdantic.converters import is_proto, is_xml, parse_cot
+from common import blue_force, rate
+from cotdantic import Event
+
+
+def legacy_parse_cot(data: bytes):
+	if is_proto(data):
+		return Event.from_bytes(data)
+
+	if is_xml(data):
+		return Event.from_xml(data)
+
+	return None
+
+
+def packets():
+	event = blue_force()
+	return {'xml': event.to_xml(), 'protobuf': event.to_bytes()}
+
+
+def main():
+	import argparse
+
+	parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+	parser.add_argument('--number', type=int, default=2000, help='packets per measurement')
+	args = parser.parse_args()
+
+	for name, data in packets().items():
+		before = rate(lambda: legacy_parse_cot(data), args.number)
+		after = rate(lambda: parse_cot(data), args.number)
+		print(f'{name:>8}: {before:8.0f} -> {after:8.0f} packets/sec ({after / before:.2f}x)')
+
+
+if __name__ == '__main__':
+	main()
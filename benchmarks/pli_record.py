@@ -0,0 +1,46 @@
+"""decode rate and memory per record of PliRecord against the full Event model"""
+
+from cotdantic.records import PliRecord
+from cotdantic.converters import parse_cot
+from common import blue_force, rate
+import tracemalloc
+
+
+def packets(index: int = 0):
+	event = blue_force(f'benchmark-{index}')
+	return {'xml': event.to_xml(), 'protobuf': event.to_bytes()}
+
+
+def memory(func, data: list) -> float:
+	"""bytes retained per decoded record"""
+	tracemalloc.start()
+	before, _ = tracemalloc.get_traced_memory()
+	records = [func(item) for item in data]
+	after, _ = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	return (after - before) / len(records)
+
+
+def main():
+	import argparse
+
+	parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+	parser.add_argument('--number', type=int, default=2000, help='packets per rate measurement')
+	parser.add_argument(
+		'--records', type=int, default=10000, help='records held for the memory measurement'
+	)
+	args = parser.parse_args()
+
+	for name, data in packets().items():
+		before = rate(lambda: parse_cot(data), args.number)
+		after = rate(lambda: PliRecord.from_cot(data), args.number)
+		print(f'{name:>8}: {before:8.0f} -> {after:8.0f} packets/sec ({after / before:.2f}x)')
+
+	data = [packets(index)['protobuf'] for index in range(args.records)]
+	before = memory(parse_cot, data)
+	after = memory(PliRecord.from_cot, data)
+	print(f'  memory: {before:8.0f} -> {after:8.0f} bytes/record ({before / after:.1f}x smaller)')
+
+
+if __name__ == '__main__':
+	main()
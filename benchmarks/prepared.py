@@ -0,0 +1,39 @@
+"""events/sec of PreparedEvent against a full Event.to_bytes / Event.to_xml per beacon"""
+
+from cotdantic.prepared import PreparedEvent
+from cotdantic.models import epoch2iso
+from common import blue_force, rate
+import time
+
+
+def beacon(event, encode):
+	"""what pli_send did before templates, new timestamps then a full serialization"""
+	now = int(time.time() * 1000)
+	event.time = event.start = epoch2iso(now)
+	event.stale = epoch2iso(now + 300_000)
+	return encode(event)
+
+
+def main():
+	import argparse
+
+	parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+	parser.add_argument('--number', type=int, default=2000, help='events per measurement')
+	args = parser.parse_args()
+
+	event = blue_force()
+	prepared = PreparedEvent(event)
+	cases = {
+		'to_bytes': lambda: beacon(event, type(event).to_bytes),
+		'prepared.to_bytes': lambda: prepared.to_bytes(lat=38.7, lon=-77.1),
+		'to_xml': lambda: beacon(event, type(event).to_xml),
+		'prepared.to_xml': lambda: prepared.to_xml(lat=38.7, lon=-77.1),
+	}
+
+	for name, func in cases.items():
+		number = args.number * (20 if name.startswith('prepared') else 1)
+		print(f'{name:>18}: {rate(func, number):10.0f} events/sec')
+
+
+if __name__ == '__main__':
+	main()
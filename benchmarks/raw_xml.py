@@ -0,0 +1,40 @@
+"""to_xml events/sec of events carrying unknown tags in Detail.raw_xml
+
+route events grow with their waypoint count, nested events with the depth of a single chain.
+"""
+
+from common import blue_force, route, rate
+
+
+def nested(depth: int):
+	event = blue_force()
+	opening = ''.join(f'<__level{i} depth="{i}">' for i in range(depth))
+	closing = ''.join(f'</__level{i}>' for i in reversed(range(depth)))
+	event.detail.raw_xml = (opening + closing).encode()
+	return event
+
+
+def main():
+	import argparse
+
+	parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+	parser.add_argument(
+		'--number', type=int, default=2000, help='waypoints serialized per measurement'
+	)
+	args = parser.parse_args()
+
+	for points in (50, 200, 800):
+		event = route(points)
+		print(
+			f'  route {points:4d}: {rate(event.to_xml, max(1, args.number // points), repeat=3):8.1f} events/sec'
+		)
+
+	for depth in (10, 50):
+		event = nested(depth)
+		print(
+			f' nested {depth:4d}: {rate(event.to_xml, max(1, args.number // depth), repeat=3):8.1f} events/sec'
+		)
+
+
+if __name__ == '__main__':
+	main()
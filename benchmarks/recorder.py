@@ -0,0 +1,40 @@
+"""cost of Recorder.record on the socket thread and sustained capture throughput"""
+
+from cotdantic.recorder import Recorder, capture_files
+from common import blue_force
+import tempfile
+import time
+
+
+def main():
+	import argparse
+
+	parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+	parser.add_argument('--count', type=int, default=100000, help='packets recorded')
+	parser.add_argument('--max-size', type=int, default=2**24, help='bytes per capture file')
+	args = parser.parse_args()
+
+	packet = (blue_force().to_bytes(), ('127.0.0.1', 6969))
+
+	with tempfile.TemporaryDirectory() as directory:
+		recorder = Recorder(directory, max_size=args.max_size, maxsize=args.count)
+		recorder.start()
+
+		start = time.perf_counter()
+		for _ in range(args.count):
+			recorder.record(packet)
+		queued = time.perf_counter() - start
+
+		recorder.stop()
+		total = time.perf_counter() - start
+
+		size = sum(path.stat().st_size for path in capture_files(directory))
+		print(f'  record: {args.count / queued:9.0f} packets/sec on the caller thread')
+		print(
+			f' capture: {args.count / total:9.0f} packets/sec, {size / total / 2**20:.1f} MiB/sec'
+		)
+		print(f'   files: {recorder.files}, dropped {recorder.dropped}')
+
+
+if __name__ == '__main__':
+	main()
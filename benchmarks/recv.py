@@ -0,0 +1,68 @@
+"""packets/sec and allocations of draining a udp socket with recvfrom against a RecvRing"""
+
+from cotdantic.multicast import recv_batch, set_rcvbuf, RecvRing, RCVBUF_SIZE
+from common import blue_force
+import tracemalloc
+import socket
+import time
+
+
+def packet(padding: int = 0) -> bytes:
+	return blue_force(padding=padding).to_bytes()
+
+
+def drain(
+	receiver: socket.socket, sender: socket.socket, data: bytes, count: int, ring=None, traced=False
+):
+	server = receiver.getsockname()
+	for _ in range(count):
+		sender.sendto(data, server)
+
+	if traced:
+		tracemalloc.start()
+
+	packets = []
+	start = time.perf_counter()
+	while len(packets) < count:
+		packets.extend(recv_batch(receiver, 64, ring))
+	elapsed = time.perf_counter() - start
+
+	if not traced:
+		return count / elapsed
+
+	retained, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	return retained / count, peak / count
+
+
+def main():
+	import argparse
+
+	parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+	parser.add_argument('--count', type=int, default=10000, help='datagrams per measurement')
+	parser.add_argument('--rounds', type=int, default=5, help='measurements per mode')
+	parser.add_argument(
+		'--padding', type=int, default=0, help='extra xml_detail bytes per datagram'
+	)
+	args = parser.parse_args()
+
+	data = packet(args.padding)
+	ring = RecvRing()
+
+	with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as receiver, socket.socket(
+		socket.AF_INET, socket.SOCK_DGRAM
+	) as sender:
+		set_rcvbuf(receiver, RCVBUF_SIZE)
+		receiver.bind(('127.0.0.1', 0))
+
+		print(f'{len(data)} byte datagrams, {args.count} per round')
+		for name, mode in (('recvfrom', None), ('ring', ring)):
+			rate = max(drain(receiver, sender, data, args.count, mode) for _ in range(args.rounds))
+			retained, peak = drain(receiver, sender, data, args.count, mode, traced=True)
+			print(
+				f'{name:>9}: {rate:9.0f} packets/sec, {retained:8.0f} bytes/packet retained, {peak:8.0f} peak'
+			)
+
+
+if __name__ == '__main__':
+	main()
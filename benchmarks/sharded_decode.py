@@ -0,0 +1,64 @@
+"""events/sec of ShardedDecoder across 1..N worker processes against in process parse_cot"""
+
+from cotdantic.converters import parse_cot
+from cotdantic.decoding import ShardedDecoder
+from cotdantic import Usericon, Takv, Track, Status
+from common import blue_force
+import multiprocessing
+import timeit
+import time
+
+
+def packets(count: int, uids: int):
+	result = []
+	for i in range(count):
+		event = blue_force(f'unit-{i % uids}')
+		event.detail.usericon = Usericon(iconsetpath='COT_MAPPING_2525C/a-u/a-u-G')
+		event.detail.takv = Takv(device='virtual', platform='virtual', os='linux', version='1.0.0')
+		event.detail.track = Track(speed=1.0, course=90.0)
+		event.detail.status = Status(battery=50)
+		data = event.to_xml() if i % 2 else event.to_bytes()
+		result.append((data, ('127.0.0.1', 6969)))
+	return result
+
+
+def sharded_rate(workers: int, batch, output: str) -> float:
+	received = []
+	with ShardedDecoder(workers=workers, output=output) as decoder:
+		decoder.add_observer(received.append)
+		start = time.perf_counter()
+		for packet in batch:
+			decoder.submit(packet)
+		while len(received) + decoder.failed + decoder.dropped < len(batch):
+			time.sleep(0.001)
+		elapsed = time.perf_counter() - start
+	return len(received) / elapsed
+
+
+def main():
+	import argparse
+
+	parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+	parser.add_argument('--count', type=int, default=4000, help='packets per measurement')
+	parser.add_argument('--uids', type=int, default=200, help='distinct uids in the feed')
+	parser.add_argument(
+		'--workers', type=int, default=multiprocessing.cpu_count(), help='max workers'
+	)
+	parser.add_argument(
+		'--output', default='event', choices=['event', 'dict'], help='decoded result type'
+	)
+	args = parser.parse_args()
+
+	batch = packets(args.count, args.uids)
+
+	seconds = timeit.timeit(lambda: [parse_cot(data) for data, _ in batch], number=1)
+	print(f'in process: {args.count / seconds:8.0f} events/sec')
+
+	workers = 1
+	while workers <= args.workers:
+		print(f'{workers:>3} workers: {sharded_rate(workers, batch, args.output):8.0f} events/sec')
+		workers *= 2
+
+
+if __name__ == '__main__':
+	main()
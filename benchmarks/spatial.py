@@ -0,0 +1,45 @@
+"""GridIndex updates and geofence queries against scanning every position"""
+
+from cotdantic.spatial import GridIndex, haversine
+import random
+import timeit
+
+
+def scan_radius(positions: dict, lat: float, lon: float, radius: float):
+	return [uid for uid, point in positions.items() if haversine(lat, lon, *point) <= radius]
+
+
+def main():
+	import argparse
+
+	parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+	parser.add_argument('--size', type=int, default=10000, help='tracked uids')
+	parser.add_argument('--radius', type=float, default=5000, help='geofence radius in meters')
+	parser.add_argument('--number', type=int, default=50, help='queries per measurement')
+	args = parser.parse_args()
+
+	# tracks clustered over a one degree operating area
+	positions = {
+		f'uid-{i}': (random.uniform(38, 39), random.uniform(-78, -77)) for i in range(args.size)
+	}
+	index = GridIndex()
+
+	seconds = timeit.timeit(
+		lambda: [index.update(uid, *point) for uid, point in positions.items()], number=1
+	)
+	print(f'  update: {args.size / seconds:9.0f} /sec')
+
+	before = timeit.timeit(
+		lambda: scan_radius(positions, 38.5, -77.5, args.radius), number=args.number
+	)
+	after = timeit.timeit(lambda: index.within_radius(38.5, -77.5, args.radius), number=args.number)
+	print(
+		f'  radius: {before / args.number * 1000:9.3f} -> {after / args.number * 1000:9.3f} ms/query ({before / after:.1f}x)'
+	)
+
+	after = timeit.timeit(lambda: index.nearest_k(38.5, -77.5, 10), number=args.number)
+	print(f' nearest: {after / args.number * 1000:9.3f} ms/query (k=10)')
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,207 @@
+"""codec and transport benchmarks checked against stored baselines
+
+rates are stored relative to a pure python calibration loop timed next to every case, so a
+baseline saved on one machine stays meaningful on another. a case fails when its relative rate drops more than
+--tolerance below the baseline.
+
+	python benchmarks/suite.py                     # run and compare with baseline.json
+	python benchmarks/suite.py --save              # store the current rates as the baseline
+	python benchmarks/suite.py --filter codec      # only cases whose name contains codec
+"""
+
+from cotdantic.converters import parse_cot, is_xml, is_proto
+from cotdantic.models import epoch2iso, iso2epoch
+from cotdantic.multicast import MulticastPublisher, UdpListener, TcpListener
+from cotdantic.records import PliRecord
+from cotdantic.prepared import PreparedEvent
+from cotdantic.lazy import LazyEvent
+from cotdantic import Event
+from common import blue_force, detailed, route, rate
+from typing import Callable, Dict, Optional, Tuple
+from functools import partial
+from pathlib import Path
+import socket
+import json
+import time
+import sys
+
+BASELINE = Path(__file__).with_name('baseline.json')
+
+CASES: Dict[str, Callable[[int], Optional[float]]] = {}
+
+
+def case(name: str, repeat: int = 1):
+	"""register func(number) -> operations/sec, None when the case cannot run here"""
+
+	def decorator(func: Callable[[int], Optional[float]]):
+		def best(number: int) -> Optional[float]:
+			rates = [value for value in (func(number) for _ in range(repeat)) if value is not None]
+			return max(rates) if rates else None
+
+		CASES[name] = best
+		return func
+
+	return decorator
+
+
+def calibration(number: int) -> float:
+	def loop():
+		total = 0
+		for i in range(1000):
+			total += i * i
+		return total
+
+	return rate(loop, max(1, number // 10), repeat=3)
+
+
+def codec_case(name: str, func: Callable, *build: Callable[[], object], scale: float = 1.0):
+	"""time func called with the results of build, scale adjusts number to the cost of func"""
+
+	def measure(number: int) -> float:
+		return rate(
+			partial(func, *(argument() for argument in build)),
+			max(1, int(number * scale)),
+			repeat=3,
+		)
+
+	case(name)(measure)
+
+
+codec_case('codec.from_xml', Event.from_xml, lambda: blue_force().to_xml())
+codec_case('codec.to_xml', Event.to_xml, blue_force)
+codec_case('codec.to_bytes', Event.to_bytes, blue_force)
+codec_case('codec.to_bytes.detailed', Event.to_bytes, detailed)
+codec_case('codec.from_bytes', Event.from_bytes, lambda: blue_force().to_bytes())
+codec_case('codec.parse_cot.xml', parse_cot, lambda: blue_force().to_xml())
+codec_case('codec.parse_cot.protobuf', parse_cot, lambda: blue_force().to_bytes())
+codec_case('codec.is_xml', is_xml, lambda: blue_force().to_xml(), scale=10)
+codec_case('codec.is_proto', is_proto, lambda: blue_force().to_bytes())
+codec_case('codec.route.to_xml', Event.to_xml, route, scale=0.05)
+codec_case('codec.route.from_bytes', Event.from_bytes, lambda: route().to_bytes(), scale=0.05)
+codec_case(
+	'codec.prepared.to_bytes', PreparedEvent.to_bytes, lambda: PreparedEvent(blue_force()), scale=20
+)
+codec_case(
+	'codec.prepared.to_xml', PreparedEvent.to_xml, lambda: PreparedEvent(blue_force()), scale=20
+)
+codec_case('codec.lazy.from_cot.xml', LazyEvent.from_cot, lambda: blue_force().to_xml(), scale=2)
+codec_case(
+	'codec.lazy.from_cot.protobuf', LazyEvent.from_cot, lambda: blue_force().to_bytes(), scale=2
+)
+codec_case('record.from_cot', PliRecord.from_cot, lambda: blue_force().to_bytes(), scale=10)
+codec_case('time.epoch2iso', epoch2iso.__wrapped__, lambda: 1_700_000_000_123, scale=100)
+codec_case(
+	'time.iso2epoch', iso2epoch.__wrapped__, lambda: '2023-11-14T22:13:20.123000Z', scale=100
+)
+
+
+def wait_for(count: Callable[[], int], target: int, timeout: float = 5.0) -> bool:
+	end = time.perf_counter() + timeout
+	while count() < target and time.perf_counter() < end:
+		time.sleep(0.001)
+	return count() >= target
+
+
+def datagram_rate(publisher, send: Callable[[bytes], None], number: int) -> Optional[float]:
+	received = []
+	publisher.add_observer(received.append)
+	data = blue_force().to_bytes()
+
+	start = time.perf_counter()
+	for _ in range(number):
+		send(data)
+	if not wait_for(lambda: len(received), number):
+		return None
+	return number / (time.perf_counter() - start)
+
+
+@case('transport.udp', repeat=3)
+def udp(number: int) -> Optional[float]:
+	with UdpListener(0, '127.0.0.1') as listener, socket.socket(
+		socket.AF_INET, socket.SOCK_DGRAM
+	) as sock:
+		server = listener.sock.getsockname()
+		return datagram_rate(listener, lambda data: sock.sendto(data, server), number)
+
+
+@case('transport.multicast', repeat=3)
+def multicast(number: int) -> Optional[float]:
+	try:
+		with MulticastPublisher('239.2.3.1', 16969, '127.0.0.1') as publisher:
+			return datagram_rate(publisher, publisher.send, number)
+	except OSError:
+		return None
+
+
+@case('transport.tcp', repeat=3)
+def tcp(number: int) -> Optional[float]:
+	received = []
+	stream = blue_force().to_xml() * number
+
+	with TcpListener(0, '127.0.0.1', framed=True) as listener:
+		listener.add_observer(received.append)
+		server = listener.recv_sock.getsockname()
+		start = time.perf_counter()
+		with socket.create_connection(server) as sock:
+			sock.sendall(stream)
+			if not wait_for(lambda: len(received), number):
+				return None
+		return number / (time.perf_counter() - start)
+
+
+def run(names, number: int) -> Dict[str, Tuple[Optional[float], float]]:
+	"""(rate, calibration rate) per case, calibrated next to each case to follow cpu frequency"""
+	return {name: (CASES[name](number), calibration(number)) for name in names}
+
+
+def main():
+	import argparse
+
+	parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+	parser.add_argument('--number', type=int, default=1000, help='operations per measurement')
+	parser.add_argument('--filter', type=str, default='', help='run cases whose name contains this')
+	parser.add_argument('--baseline', type=Path, default=BASELINE, help='stored relative rates')
+	parser.add_argument('--tolerance', type=float, default=0.3, help='allowed fractional slowdown')
+	parser.add_argument(
+		'--save', action='store_true', help='write the measured rates as the baseline'
+	)
+	args = parser.parse_args()
+
+	names = [name for name in CASES if args.filter in name]
+	rates = run(names, args.number)
+	relative = {
+		name: value / reference for name, (value, reference) in rates.items() if value is not None
+	}
+
+	baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+	failed = []
+
+	for name in names:
+		value, _ = rates[name]
+		if value is None:
+			print(f'{name:>26}: skipped')
+			continue
+
+		line = f'{name:>26}: {value:10.0f} /sec'
+		expected = baseline.get(name)
+		if expected is not None:
+			change = relative[name] / expected - 1
+			line += f' {change:+7.1%}'
+			if change < -args.tolerance:
+				line += ' REGRESSION'
+				failed.append(name)
+		print(line)
+
+	if args.save:
+		baseline.update(relative)
+		args.baseline.write_text(json.dumps(baseline, indent='\t', sort_keys=True) + '\n')
+		print(f'saved {len(relative)} baselines to {args.baseline}')
+		return
+
+	if failed:
+		print(f'{len(failed)} regressions: {", ".join(failed)}')
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
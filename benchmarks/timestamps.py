@@ -0,0 +1,69 @@
+"""conversions/sec of the cot timestamp codec against the strptime/strftime implementation"""
+
+from cotdantic.models import epoch2iso, iso2epoch, epochs2isos, isos2epochs
+import datetime
+import timeit
+import random
+
+
+def strftime_epoch2iso(epoch: int) -> str:
+	time = datetime.datetime.fromtimestamp(epoch / 1000, tz=datetime.timezone.utc)
+	return f'{time.strftime("%Y-%m-%dT%H:%M:%S.%f")}Z'
+
+
+def strptime_iso2epoch(iso: str) -> int:
+	if '.' in iso:
+		time = datetime.datetime.strptime(iso, '%Y-%m-%dT%H:%M:%S.%fZ').replace(
+			tzinfo=datetime.timezone.utc
+		)
+	else:
+		time = datetime.datetime.strptime(iso, '%Y-%m-%dT%H:%M:%SZ').replace(
+			tzinfo=datetime.timezone.utc
+		)
+	return int(time.timestamp() * 1000)
+
+
+def rate(func, values, number: int) -> float:
+	return (
+		number
+		* len(values)
+		/ timeit.timeit(lambda: [func(value) for value in values], number=number)
+	)
+
+
+def main():
+	import argparse
+
+	parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+	parser.add_argument('--size', type=int, default=10000, help='distinct timestamps')
+	parser.add_argument('--number', type=int, default=3, help='passes over the timestamps')
+	args = parser.parse_args()
+
+	now = int(datetime.datetime.now(datetime.timezone.utc).timestamp() * 1000)
+	epochs = [now + random.randint(0, 86_400_000) for _ in range(args.size)]
+	isos = [strftime_epoch2iso(epoch) for epoch in epochs]
+
+	# unwrap the lru caches so distinct stamps measure the parser itself
+	print(f'epoch2iso: {rate(strftime_epoch2iso, epochs, args.number):9.0f} -> ', end='')
+	print(f'{rate(epoch2iso.__wrapped__, epochs, args.number):9.0f} /sec')
+	print(f'iso2epoch: {rate(strptime_iso2epoch, isos, args.number):9.0f} -> ', end='')
+	print(f'{rate(iso2epoch.__wrapped__, isos, args.number):9.0f} /sec')
+	print(
+		f'iso2epoch (cached, repeated stamp): {rate(iso2epoch, isos[:1] * args.size, args.number):9.0f} /sec'
+	)
+
+	try:
+		import numpy as np
+	except ImportError:
+		return
+
+	epochs = np.array(epochs, dtype=np.int64)
+	isos = epochs2isos(epochs)
+	seconds = timeit.timeit(lambda: epochs2isos(epochs), number=args.number)
+	print(f'epochs2isos (numpy): {args.number * args.size / seconds:9.0f} /sec')
+	seconds = timeit.timeit(lambda: isos2epochs(isos), number=args.number)
+	print(f'isos2epochs (numpy): {args.number * args.size / seconds:9.0f} /sec')
+
+
+if __name__ == '__main__':
+	main()
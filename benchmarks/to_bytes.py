@@ -0,0 +1,22 @@
+"""events/sec of Event.to_bytes for a plain PLI and a PLI with xml_detail elements"""
+
+from common import blue_force, detailed, rate
+
+
+def events():
+	return {'pli': blue_force(), 'detailed': detailed()}
+
+
+def main():
+	import argparse
+
+	parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+	parser.add_argument('--number', type=int, default=2000, help='events per measurement')
+	args = parser.parse_args()
+
+	for name, event in events().items():
+		print(f'{name:>8}: {rate(event.to_bytes, args.number):8.0f} events/sec')
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,77 @@
+"""upserts, stale expiry and bounding box queries of TrackStore against a dict of events"""
+
+from cotdantic.models import Event, Point, Detail, Contact, epoch2iso, iso2epoch
+from cotdantic.tracks import TrackStore
+import tracemalloc
+import random
+import timeit
+import time
+
+
+def events(size: int):
+	now = int(time.time() * 1000)
+	return [
+		Event(
+			uid=f'uid-{i}',
+			type='a-f-G-U-C-I',
+			time=epoch2iso(now),
+			stale=epoch2iso(now + random.randint(0, 600_000)),
+			point=Point(lat=random.uniform(-90, 90), lon=random.uniform(-180, 180)),
+			detail=Detail(
+				contact=Contact(callsign=f'unit-{i % 100}', endpoint='127.0.0.1:4242:udp')
+			),
+		)
+		for i in range(size)
+	]
+
+
+def dict_bbox(contacts: dict, south: float, west: float, north: float, east: float):
+	return [
+		uid
+		for uid, event in contacts.items()
+		if south <= event.point.lat <= north and west <= event.point.lon <= east
+	]
+
+
+def dict_expire(contacts: dict, now: int):
+	return [uid for uid, event in contacts.items() if iso2epoch(event.stale) < now]
+
+
+def main():
+	import argparse
+
+	parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+	parser.add_argument('--size', type=int, default=50000, help='tracked uids')
+	parser.add_argument('--number', type=int, default=20, help='queries per measurement')
+	args = parser.parse_args()
+
+	data = events(args.size)
+	contacts = {event.uid: event for event in data}
+	store = TrackStore()
+
+	seconds = timeit.timeit(lambda: [store.upsert_event(event) for event in data], number=1)
+	print(f'  upsert: {args.size / seconds:9.0f} events/sec')
+
+	box = (-10.0, -10.0, 10.0, 10.0)
+	before = timeit.timeit(lambda: dict_bbox(contacts, *box), number=args.number) / args.number
+	after = timeit.timeit(lambda: store.within_bbox(*box), number=args.number) / args.number
+	print(f'    bbox: {before * 1000:9.2f} -> {after * 1000:9.2f} ms/query ({before / after:.1f}x)')
+
+	now = int(time.time() * 1000) + 300_000
+	before = timeit.timeit(lambda: dict_expire(contacts, now), number=args.number) / args.number
+	# expiry removes rows, so the store is measured on a single pass
+	after = timeit.timeit(lambda: store.expire(now), number=1)
+	print(f'  expire: {before * 1000:9.2f} -> {after * 1000:9.2f} ms/pass ({before / after:.1f}x)')
+
+	tracemalloc.start()
+	start, _ = tracemalloc.get_traced_memory()
+	fresh = TrackStore()
+	for event in data:
+		fresh.upsert_event(event)
+	end, _ = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	print(f'  memory: {(end - start) / args.size:9.0f} bytes/track')
+
+
+if __name__ == '__main__':
+	main()
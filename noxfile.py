@@ -7,3 +7,10 @@ def tests(session):
 	session.install('.')
 	session.install('pytest')
 	session.run('pytest')
+
+
+@nox.session
+def benchmarks(session):
+	"""Compare codec and transport rates with benchmarks/baseline.json, pass --save to update it."""
+	session.install('.')
+	session.run('python', 'benchmarks/suite.py', *session.posargs)
@@ -21,7 +21,7 @@ def __event_from_bytes(cls: EventBase, proto: bytes) -> EventBase:
 
 @classmethod
 def __event_from_cot(cls: EventBase, data: bytes) -> EventBase:
-	return converters.parse_cot(data)
+	return converters.parse_cot(data, cls)
 
 
 EventBase.__bytes__ = __event_to_bytes
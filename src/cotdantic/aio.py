@@ -0,0 +1,252 @@
+from .multicast import (
+	multicast_socket,
+	drop_membership,
+	StreamFramer,
+	TCP_RECV_LEN,
+	RCVBUF_SIZE,
+	FrameError,
+	MAX_FRAME,
+	udp_socket,
+	udp_drops,
+	Publisher,
+)
+from abc import ABC, abstractmethod
+from typing import Tuple, Optional, Set
+import asyncio
+import socket
+
+Packet = Tuple[bytes, Tuple[str, int]]
+
+QUEUE_SIZE = 1024  # packets buffered for async iteration
+
+
+class AsyncPublisher(Publisher[Packet], ABC):
+	"""publisher pattern with an additional async iterator stream of packets"""
+
+	def __init__(self, maxsize: int = QUEUE_SIZE):
+		super().__init__()
+		self.maxsize = maxsize
+		self.queue: Optional[asyncio.Queue] = None
+		self.received = 0
+		self.dropped = 0
+
+	def publish(self, packet: Packet):
+		"""deliver without waiting, a full stream drops its oldest packet"""
+		self.received += 1
+		self.process_observers(packet)
+
+		if self.queue is None:
+			return
+
+		if self.queue.full():
+			self.queue.get_nowait()
+			self.dropped += 1
+
+		self.queue.put_nowait(packet)
+
+	async def publish_wait(self, packet: Packet):
+		"""deliver and wait for room in the stream, applying backpressure to the sender"""
+		self.received += 1
+		self.process_observers(packet)
+
+		if self.queue is not None:
+			await self.queue.put(packet)
+
+	def close_stream(self):
+		if self.queue is None:
+			return
+
+		if self.queue.full():
+			self.queue.get_nowait()
+
+		self.queue.put_nowait(None)
+
+	def __aiter__(self) -> 'AsyncPublisher':
+		if self.queue is None:
+			self.queue = asyncio.Queue(self.maxsize)
+		return self
+
+	async def __anext__(self) -> Packet:
+		packet = await self.queue.get()
+		if packet is None:
+			raise StopAsyncIteration
+		return packet
+
+	@abstractmethod
+	async def start(self) -> 'AsyncPublisher':
+		pass
+
+	@abstractmethod
+	async def stop(self):
+		pass
+
+	async def __aenter__(self):
+		await self.start()
+		return self
+
+	async def __aexit__(self, exc_type, exec_value, traceback):
+		await self.stop()
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+	def __init__(self, publisher: AsyncPublisher):
+		self.publisher = publisher
+
+	def datagram_received(self, data: bytes, addr: Tuple[str, int]):
+		self.publisher.publish((data, addr))
+
+
+class AsyncMulticastPublisher(AsyncPublisher):
+	"""multicast socket to publisher pattern on the running event loop"""
+
+	def __init__(
+		self,
+		address: str,
+		port: int,
+		network_adapter: str = '0.0.0.0',
+		rcvbuf: int = RCVBUF_SIZE,
+		maxsize: int = QUEUE_SIZE,
+	):
+		super().__init__(maxsize)
+		self.address = address
+		self.port = port
+		self.network_adapter = network_adapter
+		self.rcvbuf = rcvbuf
+
+		self.sock: socket.socket = None
+		self.transport: Optional[asyncio.DatagramTransport] = None
+
+	async def start(self) -> 'AsyncMulticastPublisher':
+		loop = asyncio.get_running_loop()
+		self.sock = multicast_socket(self.address, self.port, self.network_adapter, self.rcvbuf)
+		self.rcvbuf = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+		self.transport, _ = await loop.create_datagram_endpoint(
+			lambda: _DatagramProtocol(self), sock=self.sock
+		)
+		return self
+
+	async def stop(self):
+		drop_membership(self.sock, self.address, self.network_adapter)
+		self.transport.close()
+		self.close_stream()
+
+	def send(self, data: bytes):
+		self.transport.sendto(data, (self.address, self.port))
+
+	@property
+	def drops(self) -> Optional[int]:
+		return udp_drops(self.sock)
+
+
+class AsyncUdpListener(AsyncPublisher):
+	"""udp socket to publisher pattern on the running event loop"""
+
+	def __init__(
+		self,
+		port: int,
+		network_adapter: str = '0.0.0.0',
+		rcvbuf: int = RCVBUF_SIZE,
+		maxsize: int = QUEUE_SIZE,
+	):
+		super().__init__(maxsize)
+		self.port = port
+		self.network_adapter = network_adapter
+		self.rcvbuf = rcvbuf
+
+		self.sock: socket.socket = None
+		self.transport: Optional[asyncio.DatagramTransport] = None
+
+	async def start(self) -> 'AsyncUdpListener':
+		loop = asyncio.get_running_loop()
+		self.sock = udp_socket(self.port, self.network_adapter, self.rcvbuf)
+		self.rcvbuf = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+		self.transport, _ = await loop.create_datagram_endpoint(
+			lambda: _DatagramProtocol(self), sock=self.sock
+		)
+		return self
+
+	async def stop(self):
+		self.transport.close()
+		self.close_stream()
+
+	def send(self, data: bytes, server: Tuple[str, int]):
+		self.transport.sendto(data, server)
+
+	@property
+	def drops(self) -> Optional[int]:
+		return udp_drops(self.sock)
+
+
+class AsyncTcpListener(AsyncPublisher):
+	"""tcp server to publisher pattern on the running event loop, see TcpListener for framed"""
+
+	def __init__(
+		self,
+		port: int,
+		network_adapter: str = '0.0.0.0',
+		maxsize: int = QUEUE_SIZE,
+		framed: bool = False,
+		max_frame: int = MAX_FRAME,
+	):
+		super().__init__(maxsize)
+		self.port = port
+		self.network_adapter = network_adapter
+		self.framed = framed
+		self.max_frame = max_frame
+
+		self.server: Optional[asyncio.AbstractServer] = None
+		self.connections: Set[asyncio.Task] = set()
+
+	async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+		task = asyncio.current_task()
+		self.connections.add(task)
+		server = writer.get_extra_info('peername')
+
+		try:
+			if self.framed:
+				await self._read_frames(reader, server)
+			else:
+				data = await reader.read()
+				if data:
+					await self.publish_wait((data, server))
+		finally:
+			writer.close()
+			self.connections.discard(task)
+
+	async def _read_frames(self, reader: asyncio.StreamReader, server: Tuple[str, int]):
+		framer = StreamFramer(self.max_frame)
+
+		while True:
+			data = await reader.read(TCP_RECV_LEN)
+
+			try:
+				frames = framer.feed(data) if data else [framer.flush()]
+			except FrameError:
+				return
+
+			for frame in frames:
+				if frame:
+					await self.publish_wait((frame, server))
+
+			if not data:
+				return
+
+	async def start(self) -> 'AsyncTcpListener':
+		self.server = await asyncio.start_server(self._handle, self.network_adapter, self.port)
+		return self
+
+	async def stop(self):
+		self.server.close()
+		for task in list(self.connections):
+			task.cancel()
+		await self.server.wait_closed()
+		self.close_stream()
+
+	async def send(self, data: bytes, server: Tuple[str, int]):
+		_, writer = await asyncio.wait_for(asyncio.open_connection(*server), 5)
+		try:
+			writer.write(data)
+			await writer.drain()
+		finally:
+			writer.close()
+			await writer.wait_closed()
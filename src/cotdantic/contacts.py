@@ -1,14 +1,30 @@
-from typing import Tuple, Callable, Dict
-from .converters import is_xml
+from typing import Tuple, Callable, Dict, Set, TYPE_CHECKING
+from dataclasses import dataclass, field
+from .converters import parse_cot
+from .spatial import GridIndex
+from .lazy import LazyEvent, LazyDecodeError
 from .models import *
+from threading import RLock, Timer
 import traceback
 import logging
+import heapq
+import time
+
+if TYPE_CHECKING:
+	from .tracks import TrackStore
 
 log = logging.getLogger(__name__)
 
 
 class Converter:
-	def __init__(self):
+	"""decode packets once and share the event with every observer
+
+	lazy=True hands observers a LazyEvent, detail is only decoded when an observer reads it.
+	a detail that fails to decode drops the packet for the remaining observers.
+	"""
+
+	def __init__(self, lazy: bool = False):
+		self.lazy = lazy
 		self.observers: List[Callable[[Event, Tuple[str, int]], None]] = []
 
 	def clear_observers(self):
@@ -21,16 +37,28 @@ class Converter:
 		self.observers.remove(func)
 
 	def process_observers(self, packet: Tuple[bytes, Tuple[str, int]]):
+		# decode lazily, once per packet; every observer shares the same event
+		if not self.observers:
+			return
+
 		data, server = packet
 
-		for observer in self.observers:
-			if is_xml(data):
-				event = Event.from_xml(data)
-			else:
-				event = Event.from_bytes(data)
+		try:
+			event = LazyEvent.from_cot(data) if self.lazy else parse_cot(data)
+		except Exception as e:
+			log.error(f'Dropping packet from {server}: ({type(e).__name__}) {e}')
+			return
+
+		if event is None:
+			return
 
+		for observer in self.observers.copy():
 			try:
 				observer(event, server)
+			except LazyDecodeError as e:
+				# the packet is bad, not the observer
+				log.error(f'Dropping packet from {server}: {e}')
+				return
 			except Exception as e:
 				log.error(f'Removing Observer ({observer.__name__}): ({type(e).__name__}) {e}')
 				log.error(traceback.format_exc())
@@ -38,10 +66,69 @@ class Converter:
 				continue
 
 
+@dataclass
+class ContactsDiff:
+	"""uids changed since the previous notification"""
+
+	added: Set[str] = field(default_factory=set)
+	updated: Set[str] = field(default_factory=set)
+	removed: Set[str] = field(default_factory=set)
+
+	def __bool__(self) -> bool:
+		return bool(self.added or self.updated or self.removed)
+
+	def add(self, uid: str):
+		if uid in self.removed:
+			self.removed.discard(uid)
+			self.updated.add(uid)
+		else:
+			self.added.add(uid)
+
+	def update(self, uid: str):
+		if uid not in self.added:
+			self.updated.add(uid)
+
+	def remove(self, uid: str):
+		# observers never saw a contact added and removed within one window
+		if uid in self.added:
+			self.added.discard(uid)
+			return
+		self.updated.discard(uid)
+		self.removed.add(uid)
+
+
 class Contacts:
-	def __init__(self):
+	def __init__(
+		self,
+		tracks: Optional['TrackStore'] = None,
+		index: Optional[GridIndex] = None,
+		max_entries: Optional[int] = None,
+		coalesce: Optional[float] = None,
+	):
+		"""tracks, a TrackStore mirroring every contact for vectorized expiry and bounding box queries
+		index, the spatial index answering radius, bounding box and nearest queries
+		max_entries, evict the least recently updated contacts beyond this count
+		coalesce, seconds of changes batched into one notification, None notifies every change
+		"""
 		self.contacts: Dict[str, Tuple[Event, Tuple[str, int]]] = {}
 		self.observers: List[Callable[['Contacts'], None]] = []
+		self.diff_observers: List[Callable[[ContactsDiff], None]] = []
+		self.removal_observers: List[Callable[[Event, Tuple[str, int]], None]] = []
+		self.tracks = tracks
+		self.index = index if index is not None else GridIndex()
+		self.max_entries = max_entries
+		# queries run on other threads than the listener, the index must not change under them
+		self.lock = RLock()
+
+		# min-heap of (stale epoch, uid), entries superseded by a newer stale are skipped on pop
+		self.expiry: List[Tuple[int, str]] = []
+		self.stale: Dict[str, int] = {}
+		self.expired = 0
+		self.evicted = 0
+
+		self.coalesce = coalesce
+		self.pending = ContactsDiff()
+		self.timer: Optional[Timer] = None
 
 	def clear_observers(self):
 		self.observers = []
@@ -52,6 +139,18 @@ class Contacts:
 	def remove_observer(self, func: Callable[['Contacts'], None]):
 		self.observers.remove(func)
 
+	def add_diff_observer(self, func: Callable[[ContactsDiff], None]):
+		self.diff_observers.append(func)
+
+	def remove_diff_observer(self, func: Callable[[ContactsDiff], None]):
+		self.diff_observers.remove(func)
+
+	def add_removal_observer(self, func: Callable[[Event, Tuple[str, int]], None]):
+		self.removal_observers.append(func)
+
+	def remove_removal_observer(self, func: Callable[[Event, Tuple[str, int]], None]):
+		self.removal_observers.remove(func)
+
 	def pli_listener(self, event: Event, server: Tuple[str, int]):
 		if event.detail.group is None:
 			return
@@ -62,8 +161,132 @@ class Contacts:
 		if event.detail.contact.callsign is None:
 			return
 
-		self.contacts[event.uid] = (event, server)
-		self.process_observers()
+		with self.lock:
+			removed = self._expire(int(time.time() * 1000))
+
+			# reinsert so dict order is least recently updated first
+			if self.contacts.pop(event.uid, None) is None:
+				self.pending.add(event.uid)
+			else:
+				self.pending.update(event.uid)
+			self.contacts[event.uid] = (event, server)
+			self._schedule(event.uid, iso2epoch(event.stale))
+			self.index.update(event.uid, event.point.lat, event.point.lon)
+			if self.tracks is not None:
+				self.tracks.upsert_event(event)
+
+			while self.max_entries is not None and len(self.contacts) > self.max_entries:
+				removed.append(self._remove(next(iter(self.contacts))))
+				self.evicted += 1
+
+			self.process_removal_observers(removed)
+			self._notify()
+
+	def _notify(self):
+		if self.coalesce is None:
+			self.flush()
+		elif self.timer is None and self.pending:
+			self.timer = Timer(self.coalesce, self.flush)
+			self.timer.daemon = True
+			self.timer.start()
+
+	def flush(self):
+		"""notify observers of the pending changes now"""
+		with self.lock:
+			if self.timer is not None:
+				self.timer.cancel()
+				self.timer = None
+
+			diff, self.pending = self.pending, ContactsDiff()
+			if not diff:
+				return
+
+			self.process_diff_observers(diff)
+			self.process_observers()
+
+	def _schedule(self, uid: str, stale: int):
+		if self.stale.get(uid) == stale:
+			return
+
+		self.stale[uid] = stale
+		heapq.heappush(self.expiry, (stale, uid))
+
+		if len(self.expiry) > 2 * len(self.stale) + 64:
+			self.expiry = [(stale, uid) for uid, stale in self.stale.items()]
+			heapq.heapify(self.expiry)
+
+	def _remove(self, uid: str) -> Tuple[Event, Tuple[str, int]]:
+		del self.stale[uid]
+		self.pending.remove(uid)
+		self.index.remove(uid)
+		if self.tracks is not None:
+			self.tracks.remove(uid)
+		return self.contacts.pop(uid)
+
+	def _expire(self, now: int) -> List[Tuple[Event, Tuple[str, int]]]:
+		removed = []
+		while self.expiry and self.expiry[0][0] < now:
+			stale, uid = heapq.heappop(self.expiry)
+			if self.stale.get(uid) != stale:
+				continue
+			removed.append(self._remove(uid))
+			self.expired += 1
+		return removed
+
+	def expire(self, now: Optional[int] = None) -> List[str]:
+		"""drop contacts whose stale time (epoch milliseconds) has passed, returns their uids"""
+		if now is None:
+			now = int(time.time() * 1000)
+
+		with self.lock:
+			if self.tracks is not None:
+				# one vectorized pass over the stale column, the heap skips the removed uids later
+				removed = [self._remove(uid) for uid in self.tracks.expire(now)]
+				self.expired += len(removed)
+			else:
+				removed = self._expire(now)
+
+			if removed:
+				self.process_removal_observers(removed)
+				self._notify()
+
+		return [event.uid for event, _ in removed]
+
+	def within_bbox(self, south: float, west: float, north: float, east: float) -> List[str]:
+		with self.lock:
+			if self.tracks is not None:
+				return self.tracks.within_bbox(south, west, north, east)
+			return self.index.within_bbox(south, west, north, east)
+
+	def within_radius(self, lat: float, lon: float, radius: float) -> List[Tuple[str, float]]:
+		"""(uid, meters) within radius meters, nearest first"""
+		with self.lock:
+			return self.index.within_radius(lat, lon, radius)
+
+	def nearest_k(self, lat: float, lon: float, k: int) -> List[Tuple[str, float]]:
+		with self.lock:
+			return self.index.nearest_k(lat, lon, k)
+
+	def process_diff_observers(self, diff: ContactsDiff):
+		for observer in self.diff_observers.copy():
+			try:
+				observer(diff)
+			except Exception as e:
+				log.error(f'Removing Observer ({observer.__name__}): ({type(e).__name__}) {e}')
+				log.error(traceback.format_exc())
+				self.remove_diff_observer(observer)
+				continue
+
+	def process_removal_observers(self, removed: List[Tuple[Event, Tuple[str, int]]]):
+		for event, server in removed:
+			for observer in self.removal_observers.copy():
+				try:
+					observer(event, server)
+				except Exception as e:
+					log.error(f'Removing Observer ({observer.__name__}): ({type(e).__name__}) {e}')
+					log.error(traceback.format_exc())
+					self.remove_removal_observer(observer)
+					continue
 
 	def process_observers(self):
 		for observer in self.observers:
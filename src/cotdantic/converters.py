@@ -17,9 +17,12 @@ from .models import (
 )
 
 import xml.etree.ElementTree as ET
-from typing import get_args, Optional
+from typing import get_origin, get_args, Optional, Tuple, Iterator, Union
+from functools import lru_cache
+from lxml import etree
 import takproto
 from enum import Enum
+import re
 
 
 # NOTE: order of iteration matters here
@@ -28,6 +31,18 @@ class ProtoVersion(Enum):
 	PROTO = b'\xbf'
 
 
+class CotFormat(Enum):
+	XML = 'xml'
+	MESH = 'mesh'
+	STREAM = 'stream'
+
+
+# optional utf-8 byte order mark and leading whitespace before the first tag
+XML_PREFIX = re.compile(rb'(?:\xef\xbb\xbf)?\s*<')
+XML_UID = re.compile(rb'<event\s[^>]*?\buid\s*=\s*["\']([^"\']*)["\']')
+XML_TIME = re.compile(rb'<event\s[^>]*?\btime\s*=\s*["\']([^"\']*)["\']')
+
+
 PROTO_KNOWN_ELEMENTS = {
 	# 'contact', # check non-standard values
 	# 'status', # check non-standard values
@@ -47,6 +62,32 @@ def is_xml(data: bytes) -> bool:
 		return False
 
 
+def decode_varint(data: bytes, offset: int = 0) -> Tuple[Optional[int], int]:
+	"""protobuf base 128 varint at offset, returns (value, end) or (None, offset) if incomplete"""
+	# field keys and short lengths are a single byte
+	if offset < len(data) and data[offset] < 0x80:
+		return data[offset], offset + 1
+
+	value = 0
+	shift = 0
+	for index in range(offset, min(len(data), offset + 10)):
+		byte = data[index]
+		value |= (byte & 0x7F) << shift
+		if not byte & 0x80:
+			return value, index + 1
+		shift += 7
+	return None, offset
+
+
+def encode_varint(value: int) -> bytes:
+	encoded = bytearray()
+	while value > 0x7F:
+		encoded.append((value & 0x7F) | 0x80)
+		value >>= 7
+	encoded.append(value)
+	return bytes(encoded)
+
+
 def handle_tak_protocal(data: bytes) -> bytes:
 	for proto_version in ProtoVersion:
 		value = proto_version.value
@@ -55,8 +96,16 @@ def handle_tak_protocal(data: bytes) -> bytes:
 		if len(data) < length:
 			continue
 
-		if data[:length] == value:
-			return data[length:]
+		if data[:length] != value:
+			continue
+
+		if proto_version is ProtoVersion.PROTO:
+			# stream framing carries a varint length after the magic byte
+			size, end = decode_varint(data, length)
+			if size is not None and size == len(data) - end:
+				return data[end:]
+
+		return data[length:]
 
 	return data[3:]
 
@@ -67,19 +116,167 @@ def is_proto(data: bytes) -> bool:
 	return bool(tak_message.cot_event._serialized_on_wire)
 
 
-def parse_cot(data):
-	if is_proto(data):
-		return Event.from_bytes(data)
+def detect_format(data: bytes) -> Optional[CotFormat]:
+	"""classify a packet from its leading bytes without parsing it"""
+	if data[:3] == ProtoVersion.MESH.value:
+		return CotFormat.MESH
 
-	if is_xml(data):
-		return Event.from_xml(data)
+	if data[:1] == ProtoVersion.PROTO.value:
+		return CotFormat.STREAM
+
+	if XML_PREFIX.match(data):
+		return CotFormat.XML
 
 	return None
 
 
+def iter_proto_fields(data: bytes) -> Iterator[Tuple[int, int, Union[int, bytes]]]:
+	"""(field number, wire type, value) of a protobuf message, stops at malformed input
+
+	varints are ints, fixed64/fixed32 and length delimited fields are raw bytes.
+	"""
+	offset = 0
+	length = len(data)
+	while offset < length:
+		key, offset = decode_varint(data, offset)
+		if key is None:
+			return
+
+		number, wire_type = key >> 3, key & 0x07
+		if wire_type == 0:
+			value, end = decode_varint(data, offset)
+			if value is None:
+				return
+		elif wire_type == 1:
+			end = offset + 8
+			value = bytes(data[offset:end])
+		elif wire_type == 5:
+			end = offset + 4
+			value = bytes(data[offset:end])
+		elif wire_type == 2:
+			size, offset = decode_varint(data, offset)
+			if size is None:
+				return
+			end = offset + size
+			value = bytes(data[offset:end])
+		else:
+			return
+
+		if end > length:
+			return
+
+		offset = end
+		yield number, wire_type, value
+
+
+def proto_field(data: bytes, number: int) -> Optional[bytes]:
+	"""raw bytes of the first length delimited field number in a protobuf message"""
+	for field, wire_type, value in iter_proto_fields(data):
+		if field == number and wire_type == 2:
+			return value
+	return None
+
+
+def peek_uid(data: bytes) -> Optional[bytes]:
+	"""event uid read straight from the packet without decoding it"""
+	cot_format = detect_format(data)
+
+	if cot_format is CotFormat.XML:
+		match = XML_UID.search(data)
+		return bytes(match.group(1)) if match else None
+
+	if cot_format is None:
+		return None
+
+	# TakMessage.cot_event = 2, CotEvent.uid = 5
+	cot_event = proto_field(handle_tak_protocal(data), 2)
+	return None if cot_event is None else proto_field(cot_event, 5)
+
+
+def peek_time(data: bytes) -> Optional[int]:
+	"""event time in epoch milliseconds read straight from the packet without decoding it"""
+	cot_format = detect_format(data)
+
+	if cot_format is CotFormat.XML:
+		match = XML_TIME.search(data)
+		if match is None:
+			return None
+		try:
+			return iso2epoch(bytes(match.group(1)).decode())
+		except (ValueError, UnicodeDecodeError):
+			return None
+
+	if cot_format is None:
+		return None
+
+	# TakMessage.cot_event = 2, CotEvent.send_time = 6
+	cot_event = proto_field(handle_tak_protocal(data), 2)
+	for number, wire_type, value in iter_proto_fields(cot_event or b''):
+		if number == 6 and wire_type == 0:
+			return value
+	return None
+
+
+def parse_message(data: bytes) -> takproto.TakMessage:
+	return takproto.TakMessage().parse(handle_tak_protocal(data))
+
+
+def parse_cot(data: bytes, cls: EventBase = Event) -> Optional[EventBase]:
+	cot_format = detect_format(data)
+
+	if cot_format is not None and isinstance(data, memoryview):
+		data = data.tobytes()
+
+	if cot_format is CotFormat.XML:
+		try:
+			root = etree.fromstring(data)
+		except etree.XMLSyntaxError:
+			return None
+		return cls.from_xml_tree(root)
+
+	if cot_format is not None:
+		proto_message = parse_message(data)
+		if not proto_message.cot_event._serialized_on_wire:
+			return None
+		return message2model(cls, proto_message)
+
+	return None
+
+
+@lru_cache
+def detail_type(cls: EventBase) -> type:
+	annotation = cls.model_fields['detail'].annotation
+	types_in_union = get_args(annotation)
+	return types_in_union[0]
+
+
+@lru_cache
+def detail_tags(custom_type: type) -> frozenset:
+	return frozenset(custom_type.tags())
+
+
+def element_list(annotation):
+	"""the List[X] inside Optional[List[X]], other annotations unchanged"""
+	if get_origin(annotation) is Union:
+		return next((arg for arg in get_args(annotation) if get_origin(arg) is list), annotation)
+	return annotation
+
+
+@lru_cache
+def xml_detail_plan(custom_type: type) -> Tuple[Tuple[str, bool], ...]:
+	"""(name, is_list) of the detail fields without a protobuf slot"""
+	return tuple(
+		(name, get_origin(element_list(info.annotation)) is list)
+		for name, info in custom_type.model_fields.items()
+		if name not in PROTO_KNOWN_ELEMENTS
+	)
+
+
 def proto2model(cls: EventBase, proto: bytes) -> EventBase:
-	proto = handle_tak_protocal(proto)
-	proto_message = takproto.TakMessage().parse(proto)
+	return message2model(cls, parse_message(proto))
+
+
+def message2model(cls: EventBase, proto_message: takproto.TakMessage) -> EventBase:
 	proto_event = proto_message.cot_event
 	proto_detail = proto_event.detail
 	proto_contact = proto_detail.contact
@@ -139,12 +336,20 @@ def proto2model(cls: EventBase, proto: bytes) -> EventBase:
 			course=proto_detail.track.course,
 		)
 
-	annotation = cls.model_fields['detail'].annotation
-	types_in_union = get_args(annotation)
-	custom_type = types_in_union[0]
-
-	raw_xml = f'<detail>{proto_detail.xml_detail}</detail>'
-	detail: Detail = custom_type.from_xml(raw_xml)
+	custom_type = detail_type(cls)
+
+	if proto_detail.xml_detail:
+		# parse once, the same tree yields known elements and unknown raw_xml
+		root = etree.fromstring(f'<detail>{proto_detail.xml_detail}</detail>')
+		detail: Detail = custom_type.from_xml_tree(root)
+		known_tags = detail_tags(custom_type)
+		detail.raw_xml = b''.join(
+			etree.tostring(child, encoding='utf-8', with_tail=False)
+			for child in root
+			if isinstance(child.tag, str) and child.tag not in known_tags
+		)
+	else:
+		detail: Detail = custom_type()
 
 	detail.precision_location = detail.precision_location or precision_location
 	detail.contact = detail.contact or contact
@@ -153,11 +358,6 @@ def proto2model(cls: EventBase, proto: bytes) -> EventBase:
 	detail.track = track
 	detail.takv = takv
 
-	root = ET.fromstring(raw_xml)
-	tags = {child.tag for child in root} - set(detail.tags())
-	tags = [ET.tostring(root.find(tag), encoding='utf-8') for tag in tags]
-	detail.raw_xml = b''.join(tags)
-
 	control = TakControl(
 		minProtoVersion=tak_control.min_proto_version,
 		maxProtoVersion=tak_control.max_proto_version,
@@ -231,15 +431,12 @@ def model2message(model: EventBase) -> takproto.TakMessage:
 		tak_detail.xml_detail = detail_str[8:-9]
 
 	else:
-		xml_string = b''
-
-		for name, _ in detail.model_fields.items():
-			if name in PROTO_KNOWN_ELEMENTS:
-				continue
+		fragments = []
 
+		for name, is_list in xml_detail_plan(type(detail)):
 			instance: CotBase = getattr(detail, name)
 
-			if instance is None:
+			if not instance:
 				continue
 
 			if name == 'contact':
@@ -254,14 +451,13 @@ def model2message(model: EventBase) -> takproto.TakMessage:
 				else:
 					encode_status = False
 
-			if isinstance(instance, list):
-				for item in instance:
-					xml_string += item.to_xml()
+			if is_list:
+				fragments.extend(item.to_xml() for item in instance)
 			else:
-				xml_string += instance.to_xml()
+				fragments.append(instance.to_xml())
 
-		xml_string += detail.raw_xml
-		tak_detail.xml_detail = xml_string.decode()
+		fragments.append(detail.raw_xml)
+		tak_detail.xml_detail = b''.join(fragments).decode()
 
 	if encode_contact and detail.contact is not None:
 		tak_detail.contact.endpoint = detail.contact.endpoint or ''
@@ -1,5 +1,14 @@
-from .multicast import MulticastPublisher, TcpListener, UdpListener
-from .converters import is_xml, is_proto
+from .multicast import (
+	MulticastPublisher,
+	TcpListener,
+	UdpListener,
+	TcpConnectionPool,
+	Dispatcher,
+	Deduplicator,
+	RCVBUF_SIZE,
+)
+from .converters import detect_format, CotFormat
+from .prepared import PreparedEvent
 from .windows import Pad, PadHandler
 from contextlib import ExitStack
 from threading import Lock
@@ -40,22 +49,22 @@ def to_pad(
 		proto_original = None
 		proto_reconstructed = None
 
-		data_type_string = 'unknown'
+		cot_format = detect_format(data)
 
-		if is_xml(data):
+		if cot_format is CotFormat.XML:
 			data_type_string = 'xml'
 			xml_original = data
 			model = Event.from_xml(data)
 			proto_reconstructed = model.to_bytes()
 			xml_reconstructed = model.to_xml()
-		elif is_proto(data):
+		elif cot_format is not None:
 			data_type_string = 'protobuf'
 			proto_original = data
 			model = Event.from_bytes(proto_original)
 			proto_reconstructed = model.to_bytes()
 			xml_reconstructed = model.to_xml()
 		else:
-			pad.print(is_proto(data))
+			pad.print(f'\n{source}: unknown format ({address[0]}) {data[:16]}')
 			return
 
 		pad.print(f'\n{source}: {data_type_string} ({address[0]})', 1)
@@ -95,10 +104,15 @@ def chat_ack(packet: Tuple[bytes, Tuple[str, int]], socket: TcpListener, pad: Pa
 			if not ack:
 				return
 
+			# tak clients read xml off the stream, the replies share one pooled connection
+			endpoint = (server[0], 4242)
+			if isinstance(socket, TcpListener) and socket.pool is not None:
+				socket.pool.set_framed(endpoint)
+
 			event1, event2 = ack_message(event)
-			socket.send(bytes(event1), (server[0], 4242))
-			socket.send(bytes(event2), (server[0], 4242))
-			socket.send(bytes(echo_chat(event)), (server[0], 4242))
+			socket.send(event1.to_xml(), endpoint)
+			socket.send(event2.to_xml(), endpoint)
+			socket.send(echo_chat(event).to_xml(), endpoint)
 
 	except Exception as e:
 		pad.print(f'\n\n{type(e)}')
@@ -121,16 +135,26 @@ def cotdantic(stdscr, args):
 	unicast = args.unicast
 	debug = args.debug
 	echo = args.echo
+	rcvbuf = args.rcvbuf
 
 	converter = Converter()
-	contacts = Contacts()
+	contacts = Contacts(coalesce=0.25)
 	phandler = PadHandler(stdscr)
 
 	with ExitStack() as stack:
-		multicast = stack.enter_context(MulticastPublisher(maddress, mport, minterface))
-		group_chat = stack.enter_context(MulticastPublisher(gaddress, gport, ginterface))
-		unicast_udp = stack.enter_context(UdpListener(uport, interface))
-		unicast_tcp = stack.enter_context(TcpListener(tport, interface))
+		multicast = stack.enter_context(MulticastPublisher(maddress, mport, minterface, rcvbuf))
+		group_chat = stack.enter_context(MulticastPublisher(gaddress, gport, ginterface, rcvbuf))
+		unicast_udp = stack.enter_context(UdpListener(uport, interface, rcvbuf))
+		pool = stack.enter_context(TcpConnectionPool())
+		unicast_tcp = stack.enter_context(TcpListener(tport, interface, framed=True, pool=pool))
+
+		# curses output is serialized by print_lock, a single worker keeps arrival order
+		dispatcher = stack.enter_context(Dispatcher(workers=1))
+		# the same event often arrives on several paths, show and ack it once
+		deduplicator = Deduplicator()
+		for publisher in (multicast, group_chat, unicast_udp, unicast_tcp):
+			publisher.set_deduplicator(deduplicator)
+			publisher.set_dispatcher(dispatcher)
 
 		multicast.add_observer(partial(to_pad, pad=phandler.topa, source='SA', debug=debug))
 		group_chat.add_observer(partial(to_pad, pad=phandler.topa, source='CHAT', debug=debug))
@@ -141,6 +165,8 @@ def cotdantic(stdscr, args):
 		unicast_udp.add_observer(partial(chat_ack, socket=unicast_udp, pad=phandler.botr, ack=echo))
 		unicast_tcp.add_observer(partial(chat_ack, socket=unicast_tcp, pad=phandler.botr, ack=echo))
 
+		# coalesced updates arrive on a timer thread
+		@lock_decorator
 		def contact_display_update(contacts: Contacts):
 			phandler.botl._text = []
 			phandler.botl.print(f'{contacts}')
@@ -160,16 +186,20 @@ def cotdantic(stdscr, args):
 			unicast=unicast,
 		)
 
+		prepared = PreparedEvent(event)
+
 		@throttle(10 if address else -1)
 		def pli_send():
-			event.time = isotime()
-			event.start = isotime()
-			event.stale = isotime(minutes=5)
-			# multicast.send(event.to_xml())
-			multicast.send(event.to_bytes())
+			# multicast.send(prepared.to_xml())
+			multicast.send(prepared.to_bytes())
+
+		@throttle(1)
+		def expire_contacts():
+			contacts.expire()
 
 		while phandler.running:
 			pli_send()
+			expire_contacts()
 			phandler.update()
 			phandler.refresh()
 			time.sleep(0.02)
@@ -191,6 +221,7 @@ def main():
 	parser.add_argument('--uport', type=int, default=17012, help='UDP port')
 	parser.add_argument('--tport', type=int, default=4242, help='TCP port')
 	parser.add_argument('--unicast', default='tcp', choices=['tcp', 'udp'], help='Endpoint protocol')
+	parser.add_argument('--rcvbuf', type=int, default=RCVBUF_SIZE, help='UDP receive buffer bytes')
 	parser.add_argument('--debug', action='store_true', help='Print debug information')
 	parser.add_argument('--echo', action='store_true', help='Echo back direct messages')
 	args = parser.parse_args()
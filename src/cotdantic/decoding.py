@@ -0,0 +1,279 @@
+from .converters import parse_cot, peek_uid
+from .multicast import Publisher
+from multiprocessing import shared_memory
+from typing import Tuple, Optional, List, Any
+from threading import Thread, Lock
+import multiprocessing
+import struct
+import pickle
+import zlib
+import time
+
+Packet = Tuple[bytes, Tuple[str, int]]
+
+RING_SIZE = 2**22
+HEADER = struct.Struct('<QQQ')  # head (write position), tail (read position), capacity
+LENGTH = struct.Struct('<I')
+WRAP = 0xFFFFFFFF
+
+
+def _align(size: int) -> int:
+	return (size + 3) & ~3
+
+
+class ShmRing:
+	"""single producer, single consumer ring of length prefixed records in shared memory
+
+	positions only grow, the producer owns head and the consumer owns tail.
+	pair every put with a semaphore release and every get with an acquire for visibility.
+	"""
+
+	def __init__(self, size: int = RING_SIZE, name: Optional[str] = None):
+		self.owner = name is None
+		if self.owner:
+			self.capacity = _align(size)
+			self.shm = shared_memory.SharedMemory(create=True, size=HEADER.size + self.capacity)
+			HEADER.pack_into(self.shm.buf, 0, 0, 0, self.capacity)
+		else:
+			self.shm = shared_memory.SharedMemory(name=name)
+			_, _, self.capacity = HEADER.unpack_from(self.shm.buf, 0)
+
+	@property
+	def name(self) -> str:
+		return self.shm.name
+
+	def put(self, data: bytes) -> bool:
+		"""append a record, False when the ring has no room for it"""
+		buf = self.shm.buf
+		head, tail, _ = HEADER.unpack_from(buf, 0)
+		size = _align(LENGTH.size + len(data))
+		offset = head % self.capacity
+		contiguous = self.capacity - offset
+		padding = contiguous if size > contiguous else 0
+
+		if size + padding > self.capacity - (head - tail):
+			return False
+
+		if padding:
+			LENGTH.pack_into(buf, HEADER.size + offset, WRAP)
+			head += padding
+			offset = 0
+
+		start = HEADER.size + offset
+		LENGTH.pack_into(buf, start, len(data))
+		buf[start + LENGTH.size : start + LENGTH.size + len(data)] = data
+		struct.pack_into('<Q', buf, 0, head + size)
+		return True
+
+	def get(self) -> Optional[bytes]:
+		"""pop the oldest record, None when empty"""
+		buf = self.shm.buf
+		while True:
+			head, tail, _ = HEADER.unpack_from(buf, 0)
+			if tail == head:
+				return None
+
+			offset = tail % self.capacity
+			start = HEADER.size + offset
+			(length,) = LENGTH.unpack_from(buf, start)
+
+			if length == WRAP:
+				struct.pack_into('<Q', buf, 8, tail + self.capacity - offset)
+				continue
+
+			data = bytes(buf[start + LENGTH.size : start + LENGTH.size + length])
+			struct.pack_into('<Q', buf, 8, tail + _align(LENGTH.size + length))
+			return data
+
+	def close(self):
+		self.shm.close()
+		if self.owner:
+			self.shm.unlink()
+
+
+def pack_packet(packet: Packet) -> bytes:
+	data, server = packet
+	host, port = server[0].encode(), server[1]
+	return struct.pack('<HB', port, len(host)) + host + bytes(data)
+
+
+def unpack_packet(record: bytes) -> Packet:
+	port, length = struct.unpack_from('<HB', record)
+	host = record[3 : 3 + length].decode()
+	return record[3 + length :], (host, port)
+
+
+def compact(event) -> dict:
+	"""header, point and contact of an event as a plain dict"""
+	contact = event.detail.contact if event.detail is not None else None
+	return {
+		'uid': event.uid,
+		'type': event.type,
+		'how': event.how,
+		'time': event.time,
+		'start': event.start,
+		'stale': event.stale,
+		'lat': event.point.lat,
+		'lon': event.point.lon,
+		'hae': event.point.hae,
+		'ce': event.point.ce,
+		'le': event.point.le,
+		'callsign': contact.callsign if contact is not None else None,
+	}
+
+
+def _worker(in_name: str, out_name: str, pending, results, output: str):
+	in_ring = ShmRing(name=in_name)
+	out_ring = ShmRing(name=out_name)
+
+	try:
+		while True:
+			pending.acquire()
+			record = in_ring.get()
+			if not record:
+				break
+
+			data, server = unpack_packet(record)
+			try:
+				event = parse_cot(data)
+			except Exception:
+				event = None
+
+			if event is not None and output == 'dict':
+				event = compact(event)
+
+			result = pickle.dumps((event, server), protocol=pickle.HIGHEST_PROTOCOL)
+			while not out_ring.put(result):
+				time.sleep(0.0005)
+			results.release()
+	finally:
+		in_ring.close()
+		out_ring.close()
+
+
+class ShardedDecoder(Publisher[Tuple[Any, Tuple[str, int]]]):
+	"""decode raw packets across worker processes, sharded by uid to keep per uid ordering
+
+	add submit as an observer of any number of listeners, each input ring has a lock so
+	socket threads submit concurrently. observers receive (event, server) from a
+	collector thread. output='dict' returns compact dicts instead of Event models.
+	undecodable packets are counted in failed and not published.
+	"""
+
+	def __init__(self, workers: int = 2, output: str = 'event', ring_size: int = RING_SIZE):
+		super().__init__()
+		self.workers = workers
+		self.output = output
+		self.ring_size = ring_size
+
+		self.in_rings: List[ShmRing] = []
+		# ShmRing has a single producer, listener threads take the lock of their shard
+		self.locks: List[Lock] = []
+		self.out_rings: List[ShmRing] = []
+		self.pending: List[Any] = []
+		self.processes: List[multiprocessing.Process] = []
+		self.results = None
+		self.collector: Optional[Thread] = None
+		self.running = False
+
+		self.shard_submitted = [0] * workers
+		self.shard_dropped = [0] * workers
+		self.decoded = 0
+		self.failed = 0
+
+	@property
+	def submitted(self) -> int:
+		return sum(self.shard_submitted)
+
+	@property
+	def dropped(self) -> int:
+		return sum(self.shard_dropped)
+
+	def shard(self, data: bytes) -> int:
+		uid = peek_uid(data) or b''
+		return zlib.crc32(uid) % self.workers
+
+	def submit(self, packet: Packet) -> bool:
+		index = self.shard(packet[0])
+		record = pack_packet(packet)
+		with self.locks[index]:
+			if not self.in_rings[index].put(record):
+				self.shard_dropped[index] += 1
+				return False
+			self.shard_submitted[index] += 1
+		self.pending[index].release()
+		return True
+
+	def _collect(self):
+		while self.running or self.decoded + self.failed < self.submitted:
+			if not self.results.acquire(timeout=0.1):
+				continue
+
+			record = None
+			while record is None:
+				for ring in self.out_rings:
+					record = ring.get()
+					if record is not None:
+						break
+
+			event, server = pickle.loads(record)
+			if event is None:
+				self.failed += 1
+				continue
+
+			self.decoded += 1
+			self.process_observers((event, server))
+
+	def start(self) -> 'ShardedDecoder':
+		context = multiprocessing.get_context()
+		self.results = context.Semaphore(0)
+
+		for _ in range(self.workers):
+			in_ring, out_ring = ShmRing(self.ring_size), ShmRing(self.ring_size)
+			pending = context.Semaphore(0)
+			process = context.Process(
+				target=_worker,
+				args=(in_ring.name, out_ring.name, pending, self.results, self.output),
+				daemon=True,
+			)
+			process.start()
+
+			self.in_rings.append(in_ring)
+			self.locks.append(Lock())
+			self.out_rings.append(out_ring)
+			self.pending.append(pending)
+			self.processes.append(process)
+
+		self.running = True
+		self.collector = Thread(target=self._collect, args=(), daemon=True)
+		self.collector.start()
+		return self
+
+	def stop(self):
+		for ring, lock, pending in zip(self.in_rings, self.locks, self.pending):
+			while True:
+				with lock:
+					if ring.put(b''):
+						break
+				time.sleep(0.001)
+			pending.release()
+
+		for process in self.processes:
+			process.join(5)
+
+		self.running = False
+		if self.collector is not None:
+			self.collector.join(5)
+
+		for ring in self.in_rings + self.out_rings:
+			ring.close()
+
+		self.in_rings, self.out_rings, self.pending, self.processes = [], [], [], []
+		self.locks = []
+
+	def __enter__(self):
+		self.start()
+		return self
+
+	def __exit__(self, exc_type, exec_value, traceback):
+		self.stop()
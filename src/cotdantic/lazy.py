@@ -0,0 +1,161 @@
+from .converters import (
+	detect_format,
+	handle_tak_protocal,
+	iter_proto_fields,
+	proto_field,
+	CotFormat,
+)
+from .converters import message2model, parse_message
+from .models import EventBase, Event, Point, epoch2iso
+from typing import Optional, Union
+from lxml import etree
+import struct
+
+DOUBLE = struct.Struct('<d')
+
+# CotEvent fields decoded up front, everything else waits for the full decode
+HEADER_FIELDS = {1: 'type', 5: 'uid', 6: 'time', 7: 'start', 8: 'stale', 9: 'how'}
+POINT_FIELDS = {10: 'lat', 11: 'lon', 12: 'hae', 13: 'ce', 14: 'le'}
+
+
+class LazyDecodeError(ValueError):
+	"""deferred decode of a LazyEvent failed, the packet is malformed past its header"""
+
+
+class LazyEvent:
+	"""event with uid, type, how, times and point decoded up front, the rest on first access
+
+	the packet is kept as an lxml tree or protobuf bytes. reading detail, or any other
+	Event attribute or method, decodes the full event of cls once and caches it.
+	a malformed detail raises LazyDecodeError on that first access.
+	pipelines that drop most events on uid, type or position skip the detail models.
+	"""
+
+	__slots__ = ('uid', 'type', 'how', 'time', 'start', 'stale', 'point', 'cls', 'source', 'event')
+
+	def __init__(
+		self,
+		uid: str,
+		type: str,
+		how: Optional[str],
+		time: str,
+		start: str,
+		stale: str,
+		point: Point,
+		source: Union[etree._Element, bytes],
+		cls: type = Event,
+	):
+		self.uid = uid
+		self.type = type
+		self.how = how
+		self.time = time
+		self.start = start
+		self.stale = stale
+		self.point = point
+		self.source = source
+		self.cls = cls
+		self.event: Optional[EventBase] = None
+
+	def __repr__(self) -> str:
+		state = 'decoded' if self.event is not None else 'lazy'
+		return f'LazyEvent(uid={self.uid!r}, type={self.type!r}, {state})'
+
+	def __eq__(self, other) -> bool:
+		if isinstance(other, LazyEvent):
+			other = other.to_event()
+		return self.to_event() == other
+
+	def __getattr__(self, name: str):
+		# reached for names outside __slots__, and for slots of an instance not yet initialized
+		if name in LazyEvent.__slots__ or name.startswith('__'):
+			raise AttributeError(name)
+		return getattr(self.to_event(), name)
+
+	def __bytes__(self) -> bytes:
+		return bytes(self.to_event())
+
+	@property
+	def decoded(self) -> bool:
+		return self.event is not None
+
+	@property
+	def detail(self):
+		return self.to_event().detail
+
+	def to_event(self) -> EventBase:
+		if self.event is None:
+			try:
+				if isinstance(self.source, bytes):
+					self.event = message2model(self.cls, parse_message(self.source))
+				else:
+					self.event = self.cls.from_xml_tree(self.source)
+			except Exception as e:
+				raise LazyDecodeError(f'{self.uid}: ({type(e).__name__}) {e}') from e
+			self.source = None
+		return self.event
+
+	@classmethod
+	def from_cot(cls, data: bytes, event_cls: type = Event) -> Optional['LazyEvent']:
+		cot_format = detect_format(data)
+
+		if cot_format is not None and isinstance(data, memoryview):
+			data = data.tobytes()
+
+		if cot_format is CotFormat.XML:
+			return cls.from_xml(data, event_cls)
+
+		if cot_format is not None:
+			return cls.from_proto(data, event_cls)
+
+		return None
+
+	@classmethod
+	def from_xml(cls, data: bytes, event_cls: type = Event) -> Optional['LazyEvent']:
+		try:
+			root = etree.fromstring(bytes(data))
+		except etree.XMLSyntaxError:
+			return None
+
+		point = root.find('point')
+		if root.tag != 'event' or point is None:
+			return None
+
+		attrib = root.attrib
+		return cls(
+			uid=attrib.get('uid'),
+			type=attrib.get('type'),
+			how=attrib.get('how'),
+			time=attrib.get('time'),
+			start=attrib.get('start'),
+			stale=attrib.get('stale'),
+			point=Point(**point.attrib),
+			source=root,
+			cls=event_cls,
+		)
+
+	@classmethod
+	def from_proto(cls, data: bytes, event_cls: type = Event) -> Optional['LazyEvent']:
+		cot_event = proto_field(handle_tak_protocal(data), 2)
+		if cot_event is None:
+			return None
+
+		header = {'type': '', 'uid': '', 'how': '', 'time': 0, 'start': 0, 'stale': 0}
+		point = {'lat': 0.0, 'lon': 0.0, 'hae': 0.0, 'ce': 0.0, 'le': 0.0}
+
+		for number, _, value in iter_proto_fields(cot_event):
+			if number in HEADER_FIELDS:
+				header[HEADER_FIELDS[number]] = value if isinstance(value, int) else value.decode()
+			elif number in POINT_FIELDS:
+				(point[POINT_FIELDS[number]],) = DOUBLE.unpack(value)
+
+		return cls(
+			uid=header['uid'],
+			type=header['type'],
+			how=header['how'],
+			time=epoch2iso(header['time']),
+			start=epoch2iso(header['start']),
+			stale=epoch2iso(header['stale']),
+			point=Point(**point),
+			source=bytes(data),
+			cls=event_cls,
+		)
@@ -0,0 +1,250 @@
+from .spatial import METERS_PER_DEGREE
+from .templates import default_blue_force
+from .prepared import PreparedEvent
+from .converters import ProtoVersion
+from typing import Callable, List, Optional, Tuple
+from dataclasses import dataclass, field
+from threading import Event as Signal
+import random
+import math
+import time
+
+WAYPOINTS = 4  # per unit in route mode
+
+
+@dataclass
+class LoadStats:
+	sent: int = 0
+	failed: int = 0
+	elapsed: float = 0.0
+	per_second: List[int] = field(default_factory=list)
+
+	@property
+	def rate(self) -> float:
+		return self.sent / self.elapsed if self.elapsed else 0.0
+
+
+class Unit:
+	"""simulated track, a random walk or a loop over waypoints"""
+
+	__slots__ = ('prepared', 'lat', 'lon', 'heading', 'speed', 'route', 'waypoint', 'moved')
+
+	def __init__(
+		self,
+		prepared: PreparedEvent,
+		lat: float,
+		lon: float,
+		speed: float,
+		route: List[Tuple[float, float]],
+	):
+		self.prepared = prepared
+		self.lat = lat
+		self.lon = lon
+		self.heading = random.uniform(0, 2 * math.pi)
+		self.speed = speed
+		self.route = route
+		self.waypoint = 0
+		self.moved = time.perf_counter()
+
+	def move(self, now: float, center: Tuple[float, float], radius: float):
+		distance = self.speed * (now - self.moved)
+		self.moved = now
+
+		if self.route:
+			target_lat, target_lon = self.route[self.waypoint]
+			north = (target_lat - self.lat) * METERS_PER_DEGREE
+			east = (target_lon - self.lon) * METERS_PER_DEGREE * math.cos(math.radians(self.lat))
+			if math.hypot(north, east) <= distance:
+				self.lat, self.lon = target_lat, target_lon
+				self.waypoint = (self.waypoint + 1) % len(self.route)
+				return
+			self.heading = math.atan2(east, north)
+		else:
+			self.heading += random.gauss(0, 0.3)
+			north = (center[0] - self.lat) * METERS_PER_DEGREE
+			east = (center[1] - self.lon) * METERS_PER_DEGREE * math.cos(math.radians(self.lat))
+			if math.hypot(north, east) > radius:
+				self.heading = math.atan2(east, north)
+
+		self.lat += distance * math.cos(self.heading) / METERS_PER_DEGREE
+		self.lon += (
+			distance
+			* math.sin(self.heading)
+			/ (METERS_PER_DEGREE * math.cos(math.radians(self.lat)))
+		)
+
+
+class LoadGenerator:
+	"""simulated blue force units sending PLIs round robin at an aggregate rate
+
+	every unit owns a PreparedEvent serialized once, a send only moves the unit and
+	patches its position and timestamps. send is any callable taking the payload,
+	a send returning False (e.g. TcpConnectionPool.send_nowait on a full queue) counts as failed.
+	"""
+
+	def __init__(
+		self,
+		send: Callable[[bytes], Optional[bool]],
+		units: int = 1000,
+		rate: float = 1000.0,
+		center: Tuple[float, float] = (38.691420, -77.134600),
+		radius: float = 5000.0,
+		speed: float = 1.5,
+		route: bool = False,
+		proto_version: ProtoVersion = ProtoVersion.MESH,
+		address: str = '127.0.0.1',
+	):
+		self.send = send
+		self.rate = rate
+		self.center = center
+		self.radius = radius
+		self.stopped = Signal()
+		self.units = [
+			self._unit(index, speed, route, proto_version, address) for index in range(units)
+		]
+
+	def _point(self) -> Tuple[float, float]:
+		distance = self.radius * math.sqrt(random.random())
+		bearing = random.uniform(0, 2 * math.pi)
+		lat = self.center[0] + distance * math.cos(bearing) / METERS_PER_DEGREE
+		lon = self.center[1] + distance * math.sin(bearing) / (
+			METERS_PER_DEGREE * math.cos(math.radians(lat))
+		)
+		return lat, lon
+
+	def _unit(
+		self, index: int, speed: float, route: bool, proto_version: ProtoVersion, address: str
+	) -> Unit:
+		lat, lon = self._point()
+		event = default_blue_force(
+			uid=f'cotdantic-load-{index}',
+			callsign=f'load-{index}',
+			group_name='Cyan',
+			group_role='Team Member',
+			address=address,
+			lat=lat,
+			lon=lon,
+		)
+		waypoints = [self._point() for _ in range(WAYPOINTS)] if route else []
+		return Unit(PreparedEvent(event, proto_version), lat, lon, speed, waypoints)
+
+	def stop(self):
+		self.stopped.set()
+
+	def run(
+		self, duration: Optional[float] = None, on_second: Optional[Callable[[int], None]] = None
+	) -> LoadStats:
+		"""send until duration seconds pass or stop is called, on_second gets each second's count"""
+		stats = LoadStats()
+		start = time.perf_counter()
+		second = start + 1
+		count = 0
+		sent = 0
+
+		while not self.stopped.is_set():
+			now = time.perf_counter()
+			if duration is not None and now - start >= duration:
+				break
+
+			if now >= second:
+				stats.per_second.append(count)
+				if on_second is not None:
+					on_second(count)
+				count = 0
+				second += 1
+
+			# ahead of the schedule waits, behind it sends without pause to catch up
+			ahead = start + sent / self.rate - now
+			if ahead > 0.001:
+				self.stopped.wait(ahead)
+				continue
+
+			unit = self.units[sent % len(self.units)]
+			unit.move(now, self.center, self.radius)
+			data = unit.prepared.to_bytes(int(time.time() * 1000), unit.lat, unit.lon)
+			sent += 1
+
+			try:
+				accepted = self.send(data) is not False
+			except OSError:
+				accepted = False
+
+			if accepted:
+				stats.sent += 1
+				count += 1
+			else:
+				stats.failed += 1
+
+		stats.elapsed = time.perf_counter() - start
+		return stats
+
+
+def main():
+	from .multicast import TcpConnectionPool
+	import argparse
+	import socket
+
+	parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+	parser.add_argument('--units', type=int, default=1000, help='simulated units')
+	parser.add_argument('--rate', type=float, default=1000.0, help='aggregate PLIs per second')
+	parser.add_argument(
+		'--duration', type=float, default=None, help='seconds to run, default until ctrl-c'
+	)
+	parser.add_argument(
+		'--transport', default='multicast', choices=['multicast', 'udp', 'tcp'], help='send path'
+	)
+	parser.add_argument('--address', type=str, default='239.2.3.1', help='destination address')
+	parser.add_argument('--port', type=int, default=6969, help='destination port')
+	parser.add_argument('--interface', type=str, default='0.0.0.0', help='multicast interface')
+	parser.add_argument(
+		'--route', action='store_true', help='units loop waypoints instead of random walks'
+	)
+	parser.add_argument('--speed', type=float, default=1.5, help='unit speed in meters per second')
+	parser.add_argument(
+		'--radius', type=float, default=5000.0, help='operating area radius in meters'
+	)
+	args = parser.parse_args()
+
+	server = (args.address, args.port)
+
+	if args.transport == 'tcp':
+		# stream framing is self delimiting, the server keeps one pooled connection
+		pool = TcpConnectionPool(framed=[server])
+		send = lambda data: pool.send_nowait(data, server)  # noqa: E731
+		proto_version = ProtoVersion.PROTO
+		close = pool.close
+	else:
+		sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+		if args.transport == 'multicast':
+			sock.setsockopt(
+				socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(args.interface)
+			)
+			sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+		send = lambda data: sock.sendto(data, server)  # noqa: E731
+		proto_version = ProtoVersion.MESH
+		close = sock.close
+
+	generator = LoadGenerator(
+		send,
+		units=args.units,
+		rate=args.rate,
+		radius=args.radius,
+		speed=args.speed,
+		route=args.route,
+		proto_version=proto_version,
+	)
+
+	try:
+		stats = generator.run(args.duration, on_second=lambda count: print(f'{count:8d} PLI/sec'))
+	except KeyboardInterrupt:
+		return
+	finally:
+		close()
+
+	print(
+		f'sent {stats.sent} PLIs in {stats.elapsed:.2f}s, {stats.rate:.0f}/sec, {stats.failed} failed'
+	)
+
+
+if __name__ == '__main__':
+	main()
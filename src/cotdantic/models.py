@@ -1,9 +1,9 @@
-from typing import TypeVar, Generic, Optional, Union, Any, List, get_args
+from typing import TypeVar, Generic, Optional, Union, Any, List, Tuple, get_args, get_origin
 from pydantic_xml import element, attr, xml_field_serializer
 from pydantic_xml.element import XmlElementWriter
 from pydantic_xml.model import XmlEntityInfo
 from functools import partial, lru_cache
-import xml.etree.ElementTree as ET
+from lxml import etree
 from pydantic import Field
 from uuid import uuid4
 import pydantic_xml
@@ -30,17 +30,32 @@ class CotBase(pydantic_xml.BaseXmlModel, search_mode='unordered'):
 T = TypeVar('T', bound=CotBase)
 
 
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
 def datetime2iso(time: datetime.datetime):
-	# return f'{time.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-4]}Z'
-	return f'{time.strftime("%Y-%m-%dT%H:%M:%S.%f")}Z'
+	return (
+		f'{time.year:04d}-{time.month:02d}-{time.day:02d}T'
+		f'{time.hour:02d}:{time.minute:02d}:{time.second:02d}.{time.microsecond:06d}Z'
+	)
+
+
+@lru_cache(maxsize=64)
+def _date_prefix(days: int) -> str:
+	date = datetime.date.fromordinal(EPOCH_ORDINAL + days)
+	return f'{date.year:04d}-{date.month:02d}-{date.day:02d}T'
 
 
+@lru_cache(maxsize=4096)
 def epoch2iso(epoch: int):
-	time = datetime.datetime.fromtimestamp(epoch / 1000, tz=datetime.timezone.utc)
-	return datetime2iso(time)
+	seconds, micro = divmod(int(round(epoch * 1000)), 1_000_000)
+	days, seconds = divmod(seconds, 86400)
+	hours, seconds = divmod(seconds, 3600)
+	minutes, seconds = divmod(seconds, 60)
+	return f'{_date_prefix(days)}{hours:02d}:{minutes:02d}:{seconds:02d}.{micro:06d}Z'
 
 
-def iso2epoch(iso: str) -> int:
+def _strptime2epoch(iso: str) -> int:
 	if '.' in iso:
 		time = datetime.datetime.strptime(iso, '%Y-%m-%dT%H:%M:%S.%fZ').replace(tzinfo=datetime.timezone.utc)
 	else:
@@ -48,6 +63,83 @@ def iso2epoch(iso: str) -> int:
 	return int(time.timestamp() * 1000)
 
 
+@lru_cache(maxsize=4096)
+def iso2epoch(iso: str) -> int:
+	# fixed layout YYYY-MM-DDTHH:MM:SS(.f{1,6})Z, anything else takes the strptime path
+	length = len(iso)
+	fixed = (
+		length >= 20
+		and iso[4] == '-'
+		and iso[7] == '-'
+		and iso[10] == 'T'
+		and iso[13] == ':'
+		and iso[16] == ':'
+		and iso[-1] == 'Z'
+		and (length == 20 or (iso[19] == '.' and 22 <= length <= 27 and iso[20:-1].isdigit()))
+	)
+
+	if not fixed:
+		return _strptime2epoch(iso)
+
+	try:
+		days = (
+			datetime.date(int(iso[0:4]), int(iso[5:7]), int(iso[8:10])).toordinal() - EPOCH_ORDINAL
+		)
+		hours, minutes, seconds = int(iso[11:13]), int(iso[14:16]), int(iso[17:19])
+	except ValueError:
+		return _strptime2epoch(iso)
+
+	if hours > 23 or minutes > 59 or seconds > 59:
+		return _strptime2epoch(iso)
+
+	millis = int(iso[20:-1][:3].ljust(3, '0')) if length > 20 else 0
+	return ((days * 24 + hours) * 60 + minutes) * 60_000 + seconds * 1000 + millis
+
+
+def epochs2isos(epochs) -> Union[List[str], Any]:
+	"""batch epoch2iso, numpy arrays are converted vectorized and returned as arrays"""
+	if hasattr(epochs, 'dtype'):
+		import numpy as np
+
+		times = np.asarray(epochs).astype('datetime64[ms]')
+		return np.char.add(np.datetime_as_string(times, unit='us'), 'Z')
+
+	return [epoch2iso(epoch) for epoch in epochs]
+
+
+def isos2epochs(isos) -> Union[List[int], Any]:
+	"""batch iso2epoch, numpy arrays are converted vectorized and returned as arrays"""
+	if hasattr(isos, 'dtype'):
+		import numpy as np
+
+		times = np.char.rstrip(np.asarray(isos, dtype=str), 'Z')
+		return times.astype('datetime64[ms]').astype(np.int64)
+
+	return [iso2epoch(iso) for iso in isos]
+
+
+@lru_cache(maxsize=256)
+def raw_elements(raw_xml: bytes, writer: type) -> Tuple[XmlElementWriter, ...]:
+	"""writer elements of a raw_xml fragment, built once per fragment and shared, do not modify"""
+
+	def build(native: etree._Element) -> XmlElementWriter:
+		built = writer(native.tag, text=native.text, attributes=dict(native.attrib))
+		for child in native:
+			if isinstance(child.tag, str):
+				built.append_element(build(child))
+		return built
+
+	root = etree.fromstring(b'<_raw>' + raw_xml + b'</_raw>')
+	return tuple(build(child) for child in root if isinstance(child.tag, str))
+
+
+def element_type(annotation: Any) -> Any:
+	"""innermost type of a field annotation, Optional[List[Link]] -> Link"""
+	while get_origin(annotation) is not None:
+		annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+	return annotation
+
+
 def isotime(hours: int = 0, minutes: int = 0, seconds: int = 0) -> str:
 	current = datetime.datetime.now(datetime.timezone.utc)
 	offset = datetime.timedelta(hours=hours, minutes=minutes, seconds=seconds)
@@ -396,12 +488,16 @@ class Detail(CotBase, tag='detail'):
 	@lru_cache
 	def tags(cls) -> List[str]:
 		detail_tags = []
-		for _, info in cls.model_fields.items():
-			if not isinstance(info, XmlEntityInfo):
+		for name, info in cls.model_fields.items():
+			# newer pydantic_xml keeps the entity info in the field metadata
+			entities = [info, *info.metadata]
+			entity = next(
+				(entity for entity in entities if isinstance(entity, XmlEntityInfo)), None
+			)
+			if entity is None:
 				continue
-			types_in_union = get_args(info.annotation)
-			custom_type = types_in_union[0]
-			detail_tags.append(custom_type.__xml_tag__)
+			custom_type = element_type(info.annotation)
+			detail_tags.append(getattr(custom_type, '__xml_tag__', None) or entity.path or name)
 		return detail_tags
 
 	@xml_field_serializer('raw_xml')
@@ -409,20 +505,9 @@ class Detail(CotBase, tag='detail'):
 		if len(value) == 0:
 			return
 
-		def _recursive_serialize(parent_element: XmlElementWriter, xml_string: str):
-			for child in ET.fromstring(xml_string):
-				child_element = parent_element.make_element(tag=child.tag, nsmap=None)
-
-				child_element.set_text(child.text)
-				for key, val in child.attrib.items():
-					child_element.set_attribute(key, val)
-
-				parent_element.append_element(child_element)
-
-				if len(child) > 0:
-					_recursive_serialize(child_element, ET.tostring(child).decode())
-
-		_recursive_serialize(element, f'<_raw>{value.decode()}</_raw>')
+		# parsed once per distinct raw_xml, the elements are appended as is
+		for child in raw_elements(value, type(element)):
+			element.append_element(child)
 
 
 class TakControl(CotBase):
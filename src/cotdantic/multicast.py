@@ -1,13 +1,189 @@
-from typing import List, Callable, Tuple, Union, Optional, TypeVar, Generic
-from threading import Thread
+from typing import (
+	List,
+	Callable,
+	Tuple,
+	Union,
+	Optional,
+	TypeVar,
+	Generic,
+	Dict,
+	Deque,
+	Any,
+	Set,
+	Iterable,
+)
+from concurrent.futures import ProcessPoolExecutor
+from .converters import decode_varint, detect_format, peek_time, peek_uid, CotFormat, ProtoVersion
+from threading import Thread, Lock, Condition, BoundedSemaphore
+from queue import Queue, Empty, Full
+from dataclasses import dataclass
+from contextlib import suppress
+from collections import deque, OrderedDict
+from itertools import groupby
+from functools import partial
+from enum import Enum
+import selectors
+import inspect
+import logging
 import platform
+import hashlib
 import socket
+import time
+import os
 import select
 
 T = TypeVar('T')
 
+log = logging.getLogger(__name__)
+
 
 UDP_MAX_LEN = 65507
+RCVBUF_SIZE = 2**22  # requested kernel receive buffer, capped by net.core.rmem_max
+RECV_BATCH = 64  # max datagrams drained per select wakeup
+TCP_RECV_LEN = 2**16
+MAX_FRAME = 2**20  # max buffered bytes per tcp connection without a complete message
+SEND_QUEUE_SIZE = 1024
+RING_SIZE = 2**22
+DEDUP_TTL = 30.0  # seconds a packet key suppresses repeats
+DEDUP_SIZE = 2**16
+
+
+def set_rcvbuf(sock: socket.socket, size: int) -> int:
+	"""request a kernel receive buffer size, returns the size granted"""
+	sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, size)
+	return sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+
+
+def udp_drops(sock: socket.socket) -> Optional[int]:
+	"""kernel drop counter of a udp socket from /proc/net/udp, None where unavailable"""
+	try:
+		inode = str(os.fstat(sock.fileno()).st_ino)
+		with open('/proc/net/udp') as f:
+			next(f)
+			for line in f:
+				fields = line.split()
+				if fields[9] == inode:
+					return int(fields[12])
+	except (OSError, ValueError, IndexError, StopIteration):
+		return None
+	return None
+
+
+class RecvRing:
+	"""preallocated receive arena handing out memoryview slices instead of new bytes objects
+
+	a view stays valid until its observers return, recv_batch ends a batch early rather
+	than wrap over a view of the same batch. publishers copy views before handing them to
+	a dispatcher or deduplicator. one ring serves one publisher.
+	"""
+
+	def __init__(self, size: int = RING_SIZE):
+		self.buffer = bytearray(max(size, 2 * UDP_MAX_LEN))
+		self.view = memoryview(self.buffer)
+		self.offset = 0
+		self.owner: Any = None
+
+	def claim(self, owner: Any):
+		if self.owner is not None and self.owner is not owner:
+			raise ValueError('a RecvRing can only serve one publisher')
+		self.owner = owner
+
+	def _next(self) -> int:
+		return self.offset if self.offset + UDP_MAX_LEN <= len(self.buffer) else 0
+
+	def room(self, first: int) -> bool:
+		"""a datagram fits without overwriting the views received since offset first"""
+		start = self._next()
+		if self.offset >= first:
+			return start == self.offset or UDP_MAX_LEN <= first
+		return start == self.offset and self.offset + UDP_MAX_LEN <= first
+
+	def recvfrom(self, sock: socket.socket, flags: int = 0) -> Tuple[memoryview, Tuple[str, int]]:
+		start = self._next()
+		nbytes, server = sock.recvfrom_into(
+			self.view[start : start + UDP_MAX_LEN], UDP_MAX_LEN, flags
+		)
+		self.offset = start + nbytes
+		return self.view[start : self.offset], server
+
+
+def recv_batch(
+	sock: socket.socket,
+	batch: int = RECV_BATCH,
+	ring: Optional[RecvRing] = None,
+) -> List[Tuple[Union[bytes, memoryview], Tuple[str, int]]]:
+	"""drain up to batch pending datagrams without blocking, into ring when given"""
+
+	def recv(flags: int = 0):
+		if ring is None:
+			return sock.recvfrom(UDP_MAX_LEN, flags)
+		return ring.recvfrom(sock, flags)
+
+	packets = [recv()]
+	first = ring.offset - len(packets[0][0]) if ring is not None else 0
+
+	dontwait = getattr(socket, 'MSG_DONTWAIT', None)
+	for _ in range(batch - 1):
+		if ring is not None and not ring.room(first):
+			break
+
+		if dontwait is None:
+			readable, _, _ = select.select([sock], [], [], 0)
+			if not readable:
+				break
+			packets.append(recv())
+			continue
+
+		try:
+			packets.append(recv(dontwait))
+		except (BlockingIOError, InterruptedError):
+			break
+
+	return packets
+
+
+def multicast_socket(
+	address: str, port: int, network_adapter: str, rcvbuf: int = RCVBUF_SIZE
+) -> socket.socket:
+	"""udp socket bound to port and joined to the multicast group address on network_adapter"""
+	sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+	set_rcvbuf(sock, rcvbuf)
+	sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+	{
+		'Linux': lambda: sock.bind((address, port)),
+		'Windows': lambda: sock.bind((network_adapter, port)),
+	}.get(platform.system(), lambda: SystemError('unsupported system'))()
+
+	sock.setsockopt(
+		socket.IPPROTO_IP,
+		socket.IP_ADD_MEMBERSHIP,
+		socket.inet_aton(address) + socket.inet_aton(network_adapter),
+	)
+
+	sock.setsockopt(
+		socket.IPPROTO_IP,
+		socket.IP_MULTICAST_IF,
+		socket.inet_aton(network_adapter),
+	)
+
+	return sock
+
+
+def drop_membership(sock: socket.socket, address: str, network_adapter: str):
+	sock.setsockopt(
+		socket.IPPROTO_IP,
+		socket.IP_DROP_MEMBERSHIP,
+		socket.inet_aton(address) + socket.inet_aton(network_adapter),
+	)
+
+
+def udp_socket(port: int, network_adapter: str, rcvbuf: int = RCVBUF_SIZE) -> socket.socket:
+	sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+	set_rcvbuf(sock, rcvbuf)
+	sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+	sock.bind((network_adapter, port))
+	return sock
 
 
 class SelectEvent:
@@ -39,11 +215,273 @@ class SelectEvent:
 		return self.r.fileno()
 
 
+class Overflow(Enum):
+	DROP_OLDEST = 'drop-oldest'
+	DROP_NEWEST = 'drop-newest'
+	BLOCK = 'block'
+
+
+@dataclass
+class ObserverStats:
+	calls: int = 0
+	errors: int = 0
+	total: float = 0.0
+	max: float = 0.0
+
+	@property
+	def mean(self) -> float:
+		return self.total / self.calls if self.calls else 0.0
+
+
+class Dispatcher:
+	"""bounded queue between publisher socket threads and their observers
+
+	workers threads run the observers. more than one worker does not preserve packet order.
+
+	with processes > 0 each call runs in a process pool without waiting for it, up to
+	2 * processes calls in flight. observers then run on a pickled copy in the child,
+	so they must be picklable module level functions whose effects leave the process
+	(files, sockets). bound methods such as Converter.process_observers would only
+	update the copy and are rejected. packet order is not preserved.
+	observers that raise are logged and removed.
+	"""
+
+	def __init__(
+		self,
+		workers: int = 1,
+		maxsize: int = 1024,
+		overflow: Overflow = Overflow.DROP_OLDEST,
+		processes: int = 0,
+	):
+		self.workers = workers
+		self.maxsize = maxsize
+		self.overflow = Overflow(overflow)
+		self.processes = processes
+
+		self.queue: Deque[Tuple['Publisher', Any]] = deque()
+		self.lock = Lock()
+		self.not_empty = Condition(self.lock)
+		self.not_full = Condition(self.lock)
+		self.running = False
+
+		self.threads: List[Thread] = []
+		self.executor: Optional[ProcessPoolExecutor] = None
+		self.in_flight = BoundedSemaphore(max(1, 2 * processes))
+
+		self.dropped = 0
+		self.max_depth = 0
+		self.stats: Dict[Callable, ObserverStats] = {}
+
+	def submit(self, publisher: 'Publisher', data: Any) -> bool:
+		with self.lock:
+			while (
+				self.overflow is Overflow.BLOCK and len(self.queue) >= self.maxsize and self.running
+			):
+				self.not_full.wait()
+
+			if len(self.queue) >= self.maxsize:
+				self.dropped += 1
+				if self.overflow is not Overflow.DROP_OLDEST:
+					return False
+				self.queue.popleft()
+
+			self.queue.append((publisher, data))
+			self.max_depth = max(self.max_depth, len(self.queue))
+			self.not_empty.notify()
+			return True
+
+	@property
+	def depth(self) -> int:
+		return len(self.queue)
+
+	def metrics(self) -> Dict[str, Any]:
+		with self.lock:
+			return {
+				'depth': len(self.queue),
+				'max_depth': self.max_depth,
+				'dropped': self.dropped,
+				'observers': {
+					getattr(observer, '__name__', repr(observer)): stats
+					for observer, stats in self.stats.items()
+				},
+			}
+
+	def _worker(self):
+		while True:
+			with self.lock:
+				while not self.queue and self.running:
+					self.not_empty.wait()
+				if not self.queue:
+					return
+				publisher, data = self.queue.popleft()
+				self.not_full.notify()
+
+			for observer in publisher.observers.copy():
+				if self.executor is not None:
+					self._submit(publisher, observer, data)
+					continue
+
+				start = time.perf_counter()
+				error = None
+				try:
+					observer(data)
+				except Exception as e:
+					error = e
+				self._record(publisher, observer, time.perf_counter() - start, error)
+
+	def _submit(self, publisher: 'Publisher', observer: Callable, data: Any):
+		if inspect.ismethod(observer):
+			error = TypeError('bound methods would run on a copy in the child process')
+			self._record(publisher, observer, 0.0, error)
+			return
+
+		self.in_flight.acquire()
+		start = time.perf_counter()
+		try:
+			future = self.executor.submit(observer, data)
+		except Exception as e:
+			self.in_flight.release()
+			self._record(publisher, observer, 0.0, e)
+			return
+		future.add_done_callback(partial(self._done, publisher, observer, start))
+
+	def _done(self, publisher: 'Publisher', observer: Callable, start: float, future):
+		self.in_flight.release()
+		error = None if future.cancelled() else future.exception()
+		self._record(publisher, observer, time.perf_counter() - start, error)
+
+	def _record(
+		self,
+		publisher: 'Publisher',
+		observer: Callable,
+		elapsed: float,
+		error: Optional[BaseException],
+	):
+		if error is not None:
+			name = getattr(observer, '__name__', repr(observer))
+			log.error(f'Removing Observer ({name}): ({type(error).__name__}) {error}')
+			with suppress(ValueError):
+				publisher.remove_observer(observer)
+
+		with self.lock:
+			stats = self.stats.setdefault(observer, ObserverStats())
+			stats.calls += 1
+			stats.errors += error is not None
+			stats.total += elapsed
+			stats.max = max(stats.max, elapsed)
+
+	def start(self) -> 'Dispatcher':
+		self.running = True
+
+		if self.processes > 0:
+			self.executor = ProcessPoolExecutor(self.processes)
+
+		for _ in range(self.workers):
+			thread = Thread(target=self._worker, args=(), daemon=True)
+			thread.start()
+			self.threads.append(thread)
+
+		return self
+
+	def stop(self):
+		with self.lock:
+			self.running = False
+			self.not_empty.notify_all()
+			self.not_full.notify_all()
+
+		for thread in self.threads:
+			thread.join(5)
+		self.threads = []
+
+		if self.executor is not None:
+			self.executor.shutdown()
+			self.executor = None
+
+	def __enter__(self):
+		self.start()
+		return self
+
+	def __exit__(self, exc_type, exec_value, traceback):
+		self.stop()
+
+
+class DedupKey(Enum):
+	EVENT = 'event'  # (uid, time) peeked from the packet, matches across xml and protobuf
+	PAYLOAD = 'payload'  # hash of the raw bytes
+
+
+class Deduplicator:
+	"""drops packets whose key was seen within ttl seconds, share one across publishers
+
+	keys are read without decoding, EVENT falls back to the payload hash when uid or time
+	is missing. at most maxsize keys are held, the oldest are evicted first.
+	"""
+
+	def __init__(
+		self, ttl: float = DEDUP_TTL, maxsize: int = DEDUP_SIZE, key: DedupKey = DedupKey.EVENT
+	):
+		self.ttl = ttl
+		self.maxsize = maxsize
+		self.key = key
+		self.lock = Lock()
+
+		# key -> expiry, the ttl is fixed so insertion order is expiry order
+		self.cache: 'OrderedDict[Any, float]' = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+
+	def key_of(self, data: bytes) -> Any:
+		if self.key is DedupKey.EVENT:
+			uid = peek_uid(data)
+			if uid is not None:
+				sent = peek_time(data)
+				if sent is not None:
+					# the key outlives the packet, never keep a view into it
+					return bytes(uid), sent
+
+		return hashlib.blake2b(data, digest_size=16).digest()
+
+	def seen(self, data: bytes) -> bool:
+		"""True for a repeat, otherwise records the packet and returns False"""
+		key = self.key_of(data)
+		now = time.monotonic()
+
+		with self.lock:
+			cache = self.cache
+			while cache:
+				oldest, expires = next(iter(cache.items()))
+				if expires > now:
+					break
+				del cache[oldest]
+
+			if key in cache:
+				self.hits += 1
+				return True
+
+			if len(cache) >= self.maxsize:
+				cache.popitem(last=False)
+
+			cache[key] = now + self.ttl
+			self.misses += 1
+			return False
+
+	@property
+	def hit_rate(self) -> float:
+		total = self.hits + self.misses
+		return self.hits / total if total else 0.0
+
+	def clear(self):
+		with self.lock:
+			self.cache.clear()
+
+
 class Publisher(Generic[T]):
 	"""generic publisher parent class pattern"""
 
 	def __init__(self):
 		self.observers: List[Callable[[T], None]] = []
+		self.dispatcher: Optional[Dispatcher] = None
+		self.deduplicator: Optional[Deduplicator] = None
 
 	def clear_observers(self):
 		self.observers = []
@@ -54,11 +492,31 @@ class Publisher(Generic[T]):
 	def remove_observer(self, func: Callable[[T], None]):
 		self.observers.remove(func)
 
+	def set_dispatcher(self, dispatcher: Optional[Dispatcher]):
+		"""hand observer calls to dispatcher worker threads, None calls them on the socket thread"""
+		self.dispatcher = dispatcher
+
+	def set_deduplicator(self, deduplicator: Optional[Deduplicator]):
+		"""drop repeated (bytes, server) packets before observers or the dispatcher see them"""
+		self.deduplicator = deduplicator
+
 	def process_observers(self, data: T):
-		for observer in self.observers:
+		if self.deduplicator is not None and self.deduplicator.seen(data[0]):
+			return
+
+		if self.dispatcher is not None:
+			# ring views are reused once process_observers returns, queued packets need a copy
+			if isinstance(data, tuple) and isinstance(data[0], memoryview):
+				data = (bytes(data[0]), *data[1:])
+			self.dispatcher.submit(self, data)
+			return
+
+		for observer in self.observers.copy():
 			try:
 				observer(data)
-			except Exception:
+			except Exception as e:
+				name = getattr(observer, '__name__', repr(observer))
+				log.error(f'Removing Observer ({name}): ({type(e).__name__}) {e}')
 				self.remove_observer(observer)
 				continue
 
@@ -66,12 +524,27 @@ class Publisher(Generic[T]):
 class MulticastPublisher(Publisher[Tuple[bytes, Tuple[str, int]]]):
 	"""multicast socket to publisher pattern"""
 
-	def __init__(self, address: str, port: int, network_adapter: str = '0.0.0.0'):
+	def __init__(
+		self,
+		address: str,
+		port: int,
+		network_adapter: str = '0.0.0.0',
+		rcvbuf: int = RCVBUF_SIZE,
+		batch: int = RECV_BATCH,
+		ring: Optional[RecvRing] = None,
+	):
 		super().__init__()
 
 		self.address = address
 		self.port = port
 		self.network_adapter = network_adapter
+		self.rcvbuf = rcvbuf
+		self.batch = batch
+		self.ring = ring
+		self.received = 0
+
+		if ring is not None:
+			ring.claim(self)
 
 		self.sock: socket.socket = None
 		self.select_event = SelectEvent()
@@ -79,26 +552,8 @@ class MulticastPublisher(Publisher[Tuple[bytes, Tuple[str, int]]]):
 		self.processing_thread: Union[Thread, None] = None
 
 	def _connect(self):
-		self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
-		self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 2**8)
-		self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-
-		{
-			'Linux': lambda: self.sock.bind((self.address, self.port)),
-			'Windows': lambda: self.sock.bind((self.network_adapter, self.port)),
-		}.get(platform.system(), lambda: SystemError('unsupported system'))()
-
-		self.sock.setsockopt(
-			socket.IPPROTO_IP,
-			socket.IP_ADD_MEMBERSHIP,
-			socket.inet_aton(self.address) + socket.inet_aton(self.network_adapter),
-		)
-
-		self.sock.setsockopt(
-			socket.IPPROTO_IP,
-			socket.IP_MULTICAST_IF,
-			socket.inet_aton(self.network_adapter),
-		)
+		self.sock = multicast_socket(self.address, self.port, self.network_adapter, self.rcvbuf)
+		self.rcvbuf = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
 
 	def stop(self):
 		self.select_event.set()
@@ -112,6 +567,10 @@ class MulticastPublisher(Publisher[Tuple[bytes, Tuple[str, int]]]):
 	def send(self, data: bytes):
 		self.sock.sendto(data, (self.address, self.port))
 
+	@property
+	def drops(self) -> Optional[int]:
+		return udp_drops(self.sock)
+
 	def start(self) -> 'MulticastPublisher':
 		self._connect()
 
@@ -120,13 +579,11 @@ class MulticastPublisher(Publisher[Tuple[bytes, Tuple[str, int]]]):
 				while True:
 					if self.select_event.wait(self.sock):
 						break
-					self.process_observers(self.sock.recvfrom(UDP_MAX_LEN))
+					for packet in recv_batch(self.sock, self.batch, self.ring):
+						self.received += 1
+						self.process_observers(packet)
 
-				self.sock.setsockopt(
-					socket.IPPROTO_IP,
-					socket.IP_DROP_MEMBERSHIP,
-					socket.inet_aton(self.address) + socket.inet_aton(self.network_adapter),
-				)
+				drop_membership(self.sock, self.address, self.network_adapter)
 
 		self.processing_thread = Thread(target=_publisher, args=(), daemon=True)
 		self.processing_thread.start()
@@ -143,13 +600,279 @@ class MulticastPublisher(Publisher[Tuple[bytes, Tuple[str, int]]]):
 			return True
 
 
-class TcpListener(Publisher[Tuple[bytes, Tuple[str, int]]]):
-	"""tcp socket to publisher pattern"""
+class FrameError(ValueError):
+	"""stream exceeded the framer buffer without a complete message"""
+
+
+class StreamFramer:
+	"""split a tcp byte stream into xml events and tak stream protobuf messages
+
+	xml ends at </event>, tak stream protobuf is 0xbf + varint length + message.
+	mesh protobuf carries no length, it is returned by flush when the stream closes.
+	"""
+
+	XML_END = b'</event>'
+	WHITESPACE = b' \t\r\n\x00'
+
+	def __init__(self, max_size: int = MAX_FRAME):
+		self.max_size = max_size
+		self.buffer = bytearray()
+		self.scanned = 0
+
+	def feed(self, data: bytes) -> List[bytes]:
+		self.buffer += data
+
+		frames = []
+		while True:
+			frame = self._next_frame()
+			if frame is None:
+				break
+			frames.append(frame)
+
+		if len(self.buffer) > self.max_size:
+			self.buffer.clear()
+			self.scanned = 0
+			raise FrameError(f'no message boundary within {self.max_size} bytes')
+
+		return frames
+
+	def flush(self) -> bytes:
+		frame = bytes(self.buffer)
+		self.buffer.clear()
+		self.scanned = 0
+		return frame
+
+	def _next_frame(self) -> Optional[bytes]:
+		buffer = self.buffer
+		mesh = ProtoVersion.MESH.value
+
+		while True:
+			start = 0
+			while start < len(buffer) and buffer[start] in self.WHITESPACE:
+				start += 1
+			if start:
+				del buffer[:start]
+				self.scanned = 0
+
+			if not buffer:
+				return None
+
+			if buffer[:3] == mesh or (len(buffer) < 3 and mesh.startswith(buffer)):
+				return None
+
+			if buffer[0] == ProtoVersion.PROTO.value[0]:
+				size, end = decode_varint(buffer, 1)
+				if size is None or len(buffer) < end + size:
+					return None
+				return self._take(end + size)
+
+			if buffer[0] == ord('<'):
+				index = buffer.find(self.XML_END, self.scanned)
+				if index < 0:
+					self.scanned = max(0, len(buffer) - len(self.XML_END) + 1)
+					return None
+				return self._take(index + len(self.XML_END))
+
+			# resynchronize on the next plausible message start
+			starts = [
+				index
+				for index in (buffer.find(b'<'), buffer.find(ProtoVersion.PROTO.value))
+				if index > 0
+			]
+			del buffer[: min(starts) if starts else len(buffer)]
+			self.scanned = 0
+
+	def _take(self, length: int) -> bytes:
+		frame = bytes(self.buffer[:length])
+		del self.buffer[:length]
+		self.scanned = 0
+		return frame
+
+
+def self_delimiting(data: bytes) -> bool:
+	"""xml and length prefixed stream protobuf can share a connection with other messages"""
+	return detect_format(data) in (CotFormat.XML, CotFormat.STREAM)
+
+
+class TcpConnectionPool:
+	"""tcp connections keyed by (host, port), kept open for servers that frame messages
+
+	send blocks the caller, send_nowait queues for a background thread.
+	a plain receiver, e.g. TcpListener(framed=False), reads one message until the connection
+	closes, so by default every message goes over its own connection, closed after the write.
+	framed servers (framed=, set_framed) split messages out of the stream: xml and stream
+	protobuf to them is coalesced into one write over a persistent connection. mesh protobuf
+	carries no length and always gets its own connection.
+	connections idle longer than idle_timeout are closed, failed writes reconnect once.
+	"""
+
+	def __init__(
+		self,
+		timeout: float = 5.0,
+		idle_timeout: float = 30.0,
+		nodelay: bool = True,
+		maxsize: int = SEND_QUEUE_SIZE,
+		framed: Iterable[Tuple[str, int]] = (),
+	):
+		self.timeout = timeout
+		self.idle_timeout = idle_timeout
+		self.nodelay = nodelay
+		self.framed: Set[Tuple[str, int]] = set(framed)
+
+		self.connections: Dict[Tuple[str, int], Tuple[socket.socket, float]] = {}
+		self.lock = Lock()
+		self.queue: Queue = Queue(maxsize)
+		self.worker: Union[Thread, None] = None
+
+		self.connects = 0
+		self.dropped = 0
+		self.failed = 0
+
+	def _connect(self, server: Tuple[str, int]) -> socket.socket:
+		entry = self.connections.get(server)
+		if entry is not None:
+			sock, _ = entry
+			if not self._closed_by_peer(sock):
+				return sock
+			self._discard(server)
+
+		sock = socket.create_connection(server, timeout=self.timeout)
+		sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, int(self.nodelay))
+		self.connections[server] = (sock, time.monotonic())
+		self.connects += 1
+		return sock
+
+	@staticmethod
+	def _closed_by_peer(sock: socket.socket) -> bool:
+		try:
+			readable, _, _ = select.select([sock], [], [], 0)
+			return bool(readable) and sock.recv(1, socket.MSG_PEEK) == b''
+		except (OSError, ValueError):
+			return True
+
+	def _discard(self, server: Tuple[str, int]):
+		sock, _ = self.connections.pop(server)
+		sock.close()
+
+	def expire(self):
+		with self.lock:
+			now = time.monotonic()
+			for server, (_, last_used) in list(self.connections.items()):
+				if now - last_used > self.idle_timeout:
+					self._discard(server)
+
+	def set_framed(self, server: Tuple[str, int], framed: bool = True):
+		"""server splits messages out of a stream, e.g. a TcpListener(framed=True) or a TAK client"""
+		if framed:
+			self.framed.add(server)
+		else:
+			self.framed.discard(server)
+
+	def persistent(self, data: bytes, server: Tuple[str, int]) -> bool:
+		return server in self.framed and self_delimiting(data)
+
+	def send(self, data: bytes, server: Tuple[str, int]):
+		if not self.persistent(data, server):
+			with socket.create_connection(server, timeout=self.timeout) as sock:
+				sock.sendall(data)
+			return
+
+		with self.lock:
+			for attempt in range(2):
+				sock = self._connect(server)
+				try:
+					sock.sendall(data)
+				except OSError:
+					self._discard(server)
+					if attempt:
+						raise
+					continue
+				self.connections[server] = (sock, time.monotonic())
+				return
+
+	def send_nowait(self, data: bytes, server: Tuple[str, int]) -> bool:
+		if self.worker is None:
+			self.worker = Thread(target=self._sender, args=(), daemon=True)
+			self.worker.start()
+
+		try:
+			self.queue.put_nowait((data, server))
+			return True
+		except Full:
+			self.dropped += 1
+			return False
+
+	def _sender(self):
+		running = True
+		while running:
+			try:
+				batch = [self.queue.get(timeout=self.idle_timeout)]
+			except Empty:
+				self.expire()
+				continue
+
+			while True:
+				try:
+					batch.append(self.queue.get_nowait())
+				except Empty:
+					break
+
+			if None in batch:
+				batch = batch[: batch.index(None)]
+				running = False
+
+			for server, items in groupby(batch, key=lambda item: item[1]):
+				messages = (data for data, _ in items)
+				for persistent, run in groupby(
+					messages, key=lambda data: self.persistent(data, server)
+				):
+					for data in [b''.join(run)] if persistent else run:
+						try:
+							self.send(data, server)
+						except OSError:
+							self.failed += 1
+
+			self.expire()
+
+	def close(self):
+		if self.worker is not None:
+			self.queue.put(None)
+			self.worker.join(5)
+			self.worker = None
+
+		with self.lock:
+			for server in list(self.connections):
+				self._discard(server)
+
+	def __enter__(self):
+		return self
 
-	def __init__(self, port: int, network_adapter: str = '0.0.0.0'):
+	def __exit__(self, exc_type, exec_value, traceback):
+		self.close()
+
+
+class TcpListener(Publisher[Tuple[bytes, Tuple[str, int]]]):
+	"""tcp socket to publisher pattern
+
+	framed=False reads one connection at a time until it closes and publishes the whole payload.
+	framed=True serves all connections concurrently and publishes each message as it completes.
+	pool sends from a background thread, see TcpConnectionPool for which servers keep a connection.
+	"""
+
+	def __init__(
+		self,
+		port: int,
+		network_adapter: str = '0.0.0.0',
+		framed: bool = False,
+		max_frame: int = MAX_FRAME,
+		pool: Optional[TcpConnectionPool] = None,
+	):
 		super().__init__()
 		self.port = port
 		self.network_adapter = network_adapter
+		self.framed = framed
+		self.max_frame = max_frame
+		self.pool = pool
 		self.recv_sock: socket.socket = None
 		self.select_event = SelectEvent()
 		self.processing_thread: Union[Thread, None] = None
@@ -180,12 +903,68 @@ class TcpListener(Publisher[Tuple[bytes, Tuple[str, int]]]):
 						if data:
 							self.process_observers((data, server))
 
-		self.processing_thread = Thread(target=_publisher, args=(), daemon=True)
+		target = self._framed_publisher if self.framed else _publisher
+		self.processing_thread = Thread(target=target, args=(), daemon=True)
 		self.processing_thread.start()
 
 		return self
 
+	def _framed_publisher(self):
+		with self.recv_sock, selectors.DefaultSelector() as selector:
+			self.recv_sock.setblocking(False)
+			selector.register(self.select_event, selectors.EVENT_READ)
+			selector.register(self.recv_sock, selectors.EVENT_READ)
+
+			running = True
+			while running:
+				for key, _ in selector.select():
+					if key.fileobj is self.select_event:
+						running = False
+						break
+
+					if key.fileobj is self.recv_sock:
+						try:
+							conn, server = self.recv_sock.accept()
+						except (BlockingIOError, InterruptedError):
+							continue
+						conn.setblocking(False)
+						selector.register(
+							conn, selectors.EVENT_READ, (server, StreamFramer(self.max_frame))
+						)
+						continue
+
+					conn = key.fileobj
+					server, framer = key.data
+
+					try:
+						data = conn.recv(TCP_RECV_LEN)
+					except (BlockingIOError, InterruptedError):
+						continue
+					except OSError:
+						data = b''
+
+					try:
+						frames = framer.feed(data) if data else [framer.flush()]
+					except FrameError:
+						frames, data = [], b''
+
+					for frame in frames:
+						if frame:
+							self.process_observers((frame, server))
+
+					if not data:
+						selector.unregister(conn)
+						conn.close()
+
+			for key in list(selector.get_map().values()):
+				if key.fileobj not in (self.select_event, self.recv_sock):
+					key.fileobj.close()
+
 	def send(self, data: bytes, server: Tuple[str, int]):
+		if self.pool is not None:
+			self.pool.send_nowait(data, server)
+			return
+
 		with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
 			sock.settimeout(5)
 			sock.connect(server)
@@ -213,10 +992,24 @@ class TcpListener(Publisher[Tuple[bytes, Tuple[str, int]]]):
 class UdpListener(Publisher[Tuple[bytes, Tuple[str, int]]]):
 	"""udp socket to publisher pattern"""
 
-	def __init__(self, port: int, network_adapter: str = '0.0.0.0'):
+	def __init__(
+		self,
+		port: int,
+		network_adapter: str = '0.0.0.0',
+		rcvbuf: int = RCVBUF_SIZE,
+		batch: int = RECV_BATCH,
+		ring: Optional[RecvRing] = None,
+	):
 		super().__init__()
 		self.port = port
 		self.network_adapter = network_adapter
+		self.rcvbuf = rcvbuf
+		self.batch = batch
+		self.ring = ring
+		self.received = 0
+
+		if ring is not None:
+			ring.claim(self)
 
 		self.sock: socket.socket = None
 		self.select_event = SelectEvent()
@@ -225,10 +1018,8 @@ class UdpListener(Publisher[Tuple[bytes, Tuple[str, int]]]):
 
 	def _connect(self):
 		"""join multicast group address:port:adapter and bind socket"""
-		self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
-		self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 2**8)
-		self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-		self.sock.bind((self.network_adapter, self.port))
+		self.sock = udp_socket(self.port, self.network_adapter, self.rcvbuf)
+		self.rcvbuf = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
 
 	def stop(self):
 		self.select_event.set()
@@ -242,6 +1033,10 @@ class UdpListener(Publisher[Tuple[bytes, Tuple[str, int]]]):
 	def send(self, data: bytes, server: Tuple[str, int]):
 		self.sock.sendto(data, server)
 
+	@property
+	def drops(self) -> Optional[int]:
+		return udp_drops(self.sock)
+
 	def start(self) -> 'MulticastPublisher':
 		self._connect()
 
@@ -251,8 +1046,9 @@ class UdpListener(Publisher[Tuple[bytes, Tuple[str, int]]]):
 					if self.select_event.wait(self.sock):
 						break
 
-					data, server = self.sock.recvfrom(UDP_MAX_LEN)
-					self.process_observers((data, server))
+					for packet in recv_batch(self.sock, self.batch, self.ring):
+						self.received += 1
+						self.process_observers(packet)
 
 		self.processing_thread = Thread(target=_publisher, args=(), daemon=True)
 		self.processing_thread.start()
@@ -0,0 +1,185 @@
+from .converters import model2message, decode_varint, encode_varint, ProtoVersion
+from .models import EventBase, epoch2iso, iso2epoch
+from typing import Dict, List, Optional, Tuple
+import struct
+import re
+import time as clock
+
+DOUBLE = struct.Struct('<d')
+
+# CotEvent field numbers
+SEND_TIME, START_TIME, STALE_TIME = 6, 7, 8
+LAT, LON, HAE = 10, 11, 12
+
+# betterproto leaves out zero values, the template is built with these in their place
+PLACEHOLDER_POINT = 1.0
+
+# patched attributes of the event and point tags
+XML_TIMES = re.compile(rb' (time|start|stale)="([^"]*)"')
+XML_POINT = re.compile(rb'<point\b[^>]*>')
+XML_COORDINATES = re.compile(rb' (lat|lon|hae)="([^"]*)"')
+
+
+def field_offsets(
+	data: bytes, start: int = 0, end: Optional[int] = None
+) -> Dict[int, Tuple[int, int]]:
+	"""field number -> (value offset, value length) of the first occurrence of each field"""
+	end = len(data) if end is None else end
+	offsets = {}
+	offset = start
+	while offset < end:
+		key, offset = decode_varint(data, offset)
+		number, wire_type = key >> 3, key & 0x07
+
+		if wire_type == 0:
+			_, value_end = decode_varint(data, offset)
+		elif wire_type == 1:
+			value_end = offset + 8
+		elif wire_type == 5:
+			value_end = offset + 4
+		elif wire_type == 2:
+			size, offset = decode_varint(data, offset)
+			value_end = offset + size
+		else:
+			raise ValueError(f'unsupported wire type {wire_type}')
+
+		offsets.setdefault(number, (offset, value_end - offset))
+		offset = value_end
+	return offsets
+
+
+class PreparedEvent:
+	"""event serialized once, later copies patch time and point into the template
+
+	start is set to time and stale keeps its original distance from time.
+	times are epoch milliseconds, a time whose varint no longer fits the protobuf
+	template rebuilds it, which happens about once a century. the xml template is
+	built on first use and kept as the segments between the patched attributes.
+	"""
+
+	def __init__(self, event: EventBase, proto_version: ProtoVersion = ProtoVersion.MESH):
+		self.event = event.model_copy(deep=True)
+		self.proto_version = proto_version
+		self.stale_offset = iso2epoch(event.stale) - iso2epoch(event.time)
+		self.point = (float(event.point.lat), float(event.point.lon), float(event.point.hae))
+		self._prepare(int(clock.time() * 1000))
+		self.xml_segments: List[bytes] = []
+		self.xml_fields: List[str] = []
+
+	def _prepare(self, now: int):
+		template = self.event.model_copy(deep=True)
+		template.point.lat = template.point.lon = template.point.hae = PLACEHOLDER_POINT
+		message = model2message(template)
+		cot_event = message.cot_event
+		cot_event.send_time = cot_event.start_time = now
+		cot_event.stale_time = now + self.stale_offset
+		payload = bytes(message)
+
+		header = self.proto_version.value
+		if self.proto_version is ProtoVersion.PROTO:
+			header += encode_varint(len(payload))
+
+		outer = field_offsets(payload)
+		event_start, event_length = outer[2]
+		inner = field_offsets(payload, event_start, event_start + event_length)
+
+		self.template = bytearray(header + payload)
+		self.slots = {
+			number: (len(header) + inner[number][0], inner[number][1]) for number in inner
+		}
+
+	def _prepare_xml(self):
+		xml = self.event.to_xml()
+		header_end = xml.index(b'>')
+		point = XML_POINT.search(xml, header_end)
+
+		spans = [
+			(m.start(2), m.end(2), m.group(1).decode())
+			for m in XML_TIMES.finditer(xml, 0, header_end)
+		]
+		spans += [
+			(m.start(2), m.end(2), m.group(1).decode())
+			for m in XML_COORDINATES.finditer(xml, *point.span())
+		]
+
+		segments, fields, last = [], [], 0
+		for start, end, name in sorted(spans):
+			segments.append(xml[last:start])
+			fields.append(name)
+			last = end
+		segments.append(xml[last:])
+
+		self.xml_segments, self.xml_fields = segments, fields
+
+	def _point(self, lat: Optional[float], lon: Optional[float], hae: Optional[float]):
+		point = (lat, lon, hae)
+		self.point = tuple(
+			old if new is None else float(new) for old, new in zip(self.point, point)
+		)
+
+	def _times(self, times: Tuple[int, int, int]) -> bool:
+		"""patch send, start and stale time, False when a varint does not fit its slot"""
+		encoded = [encode_varint(value) for value in times]
+		slots = [self.slots[number] for number in (SEND_TIME, START_TIME, STALE_TIME)]
+		if any(len(value) != length for value, (_, length) in zip(encoded, slots)):
+			return False
+
+		for value, (offset, length) in zip(encoded, slots):
+			self.template[offset : offset + length] = value
+		return True
+
+	def _double(self, number: int, value: float):
+		offset, _ = self.slots[number]
+		DOUBLE.pack_into(self.template, offset, value)
+
+	def to_bytes(
+		self,
+		time: Optional[int] = None,
+		lat: Optional[float] = None,
+		lon: Optional[float] = None,
+		hae: Optional[float] = None,
+	) -> bytes:
+		"""serialized event with time (default now) and any given point coordinates"""
+		if time is None:
+			time = int(clock.time() * 1000)
+
+		times = (time, time, time + self.stale_offset)
+		if not self._times(times):
+			self._prepare(time)
+			self._times(times)
+
+		self._point(lat, lon, hae)
+		for number, value in zip((LAT, LON, HAE), self.point):
+			self._double(number, value)
+
+		return bytes(self.template)
+
+	def to_xml(
+		self,
+		time: Optional[int] = None,
+		lat: Optional[float] = None,
+		lon: Optional[float] = None,
+		hae: Optional[float] = None,
+	) -> bytes:
+		"""xml of the event with time (default now) and any given point coordinates"""
+		if not self.xml_segments:
+			self._prepare_xml()
+
+		if time is None:
+			time = int(clock.time() * 1000)
+
+		self._point(lat, lon, hae)
+		now = epoch2iso(time).encode()
+		values = {
+			'time': now,
+			'start': now,
+			'stale': epoch2iso(time + self.stale_offset).encode(),
+			'lat': str(self.point[0]).encode(),
+			'lon': str(self.point[1]).encode(),
+			'hae': str(self.point[2]).encode(),
+		}
+
+		parts = [b''] * (2 * len(self.xml_segments) - 1)
+		parts[::2] = self.xml_segments
+		parts[1::2] = [values[name] for name in self.xml_fields]
+		return b''.join(parts)
@@ -0,0 +1,253 @@
+from .converters import detect_format, peek_uid, CotFormat
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+from queue import Queue, Empty, Full
+from threading import Thread
+from pathlib import Path
+import bisect
+import struct
+import time
+import os
+
+Packet = Tuple[bytes, Tuple[str, int]]
+
+MAGIC = b'COTREC1\n'
+# receive time (epoch seconds), payload length, format, port, host length
+RECORD = struct.Struct('<dIBHB')
+# receive time, record offset in the capture, uid length
+INDEX = struct.Struct('<dQH')
+
+FORMATS = [None, CotFormat.XML, CotFormat.MESH, CotFormat.STREAM]
+FORMAT_CODES = {cot_format: code for code, cot_format in enumerate(FORMATS)}
+
+CAPTURE_SUFFIX = '.cotlog'
+INDEX_SUFFIX = '.idx'
+MAX_CAPTURE_SIZE = 2**28
+RECORD_QUEUE_SIZE = 2**16
+FSYNC_INTERVAL = 1.0  # seconds between fsync of written records
+
+
+class Recorded(NamedTuple):
+	time: float
+	server: Tuple[str, int]
+	format: Optional[CotFormat]
+	data: bytes
+
+
+def capture_files(directory: Path, prefix: str = 'capture') -> List[Path]:
+	"""captures of a recorder in write order"""
+	return sorted(Path(directory).glob(f'{prefix}-*{CAPTURE_SUFFIX}'))
+
+
+def read_captures(directory: Path, prefix: str = 'capture') -> Iterator[Recorded]:
+	"""every record of every capture of a recorder, in write order"""
+	for path in capture_files(directory, prefix):
+		yield from CaptureReader(path)
+
+
+class Recorder:
+	"""append raw packets to length prefixed capture files with a sidecar index by time and uid
+
+	add record as an observer of any publisher, it only timestamps and queues the packet.
+	a writer thread sniffs format and uid, writes in batches, fsyncs every fsync_interval
+	seconds and starts a new capture once max_size bytes are written.
+	packets arriving while the queue is full are counted in dropped.
+	"""
+
+	def __init__(
+		self,
+		directory: str,
+		prefix: str = 'capture',
+		max_size: int = MAX_CAPTURE_SIZE,
+		fsync_interval: float = FSYNC_INTERVAL,
+		maxsize: int = RECORD_QUEUE_SIZE,
+	):
+		self.directory = Path(directory)
+		self.prefix = prefix
+		self.max_size = max_size
+		self.fsync_interval = fsync_interval
+
+		self.queue: Queue = Queue(maxsize)
+		self.worker: Optional[Thread] = None
+		self.capture = None
+		self.index = None
+		self.files = 0
+		self.last_sync = 0.0
+
+		self.recorded = 0
+		self.dropped = 0
+
+	def record(self, packet: Packet):
+		data, server = packet
+		if not isinstance(data, bytes):
+			# views into a RecvRing are reused once the observers return
+			packet = (bytes(data), server)
+
+		try:
+			self.queue.put_nowait((time.time(), packet))
+		except Full:
+			self.dropped += 1
+
+	def _open(self):
+		self._close()
+		self.directory.mkdir(parents=True, exist_ok=True)
+		existing = capture_files(self.directory, self.prefix)
+		number = int(existing[-1].stem.rsplit('-', 1)[1]) + 1 if existing else 0
+		path = self.directory / f'{self.prefix}-{number:05d}{CAPTURE_SUFFIX}'
+		self.capture = open(path, 'xb')
+		self.index = open(path.with_suffix(INDEX_SUFFIX), 'xb')
+		self.capture.write(MAGIC)
+		self.files += 1
+
+	def _sync(self):
+		for f in (self.capture, self.index):
+			f.flush()
+			os.fsync(f.fileno())
+		self.last_sync = time.monotonic()
+
+	def _close(self):
+		if self.capture is None:
+			return
+		self._sync()
+		self.capture.close()
+		self.index.close()
+		self.capture = self.index = None
+
+	def _write(self, batch: List[Tuple[float, Packet]]):
+		records, entries = [], []
+		offset = self.capture.tell()
+
+		for received, (data, server) in batch:
+			host = server[0].encode()
+			record = RECORD.pack(
+				received, len(data), FORMAT_CODES[detect_format(data)], server[1], len(host)
+			)
+			uid = peek_uid(data) or b''
+			records += (record, host, data)
+			entries += (INDEX.pack(received, offset, len(uid)), uid)
+			offset += len(record) + len(host) + len(data)
+
+		self.capture.write(b''.join(records))
+		self.index.write(b''.join(entries))
+		self.recorded += len(batch)
+
+		if time.monotonic() - self.last_sync >= self.fsync_interval:
+			self._sync()
+
+		if offset >= self.max_size:
+			self._open()
+
+	def _writer(self):
+		running = True
+		while running:
+			try:
+				batch = [self.queue.get(timeout=self.fsync_interval)]
+			except Empty:
+				self._sync()
+				continue
+
+			while True:
+				try:
+					batch.append(self.queue.get_nowait())
+				except Empty:
+					break
+
+			if None in batch:
+				batch = batch[: batch.index(None)]
+				running = False
+
+			if batch:
+				self._write(batch)
+
+		self._close()
+
+	def start(self) -> 'Recorder':
+		self._open()
+		self.worker = Thread(target=self._writer, args=(), daemon=True)
+		self.worker.start()
+		return self
+
+	def stop(self):
+		if self.worker is None:
+			return
+		self.queue.put(None)
+		self.worker.join()
+		self.worker = None
+
+	def __enter__(self):
+		self.start()
+		return self
+
+	def __exit__(self, exc_type, exec_value, traceback):
+		self.stop()
+
+
+class CaptureReader:
+	"""read one capture file, the sidecar index allows time ranges and uid lookups"""
+
+	def __init__(self, path: str):
+		self.path = Path(path)
+		self.times: List[float] = []
+		self.offsets: List[int] = []
+		self.uids: List[bytes] = []
+
+		index = self.path.with_suffix(INDEX_SUFFIX)
+		data = index.read_bytes() if index.exists() else b''
+		position = 0
+		while position + INDEX.size <= len(data):
+			received, offset, length = INDEX.unpack_from(data, position)
+			position += INDEX.size
+			if position + length > len(data):
+				break
+			self.times.append(received)
+			self.offsets.append(offset)
+			self.uids.append(data[position : position + length])
+			position += length
+
+	def __len__(self) -> int:
+		return len(self.offsets)
+
+	def __iter__(self) -> Iterator[Recorded]:
+		"""every record in the capture, a truncated tail record ends the iteration"""
+		with open(self.path, 'rb') as f:
+			if f.read(len(MAGIC)) != MAGIC:
+				raise ValueError(f'{self.path} is not a cotdantic capture')
+			while True:
+				record = self._read(f)
+				if record is None:
+					return
+				yield record
+
+	@staticmethod
+	def _read(f) -> Optional[Recorded]:
+		header = f.read(RECORD.size)
+		if len(header) < RECORD.size:
+			return None
+
+		received, length, code, port, host_length = RECORD.unpack(header)
+		host = f.read(host_length)
+		data = f.read(length)
+		if len(data) < length:
+			return None
+
+		return Recorded(received, (host.decode(), port), FORMATS[code], data)
+
+	def _records(self, offsets: List[int]) -> Iterator[Recorded]:
+		with open(self.path, 'rb') as f:
+			for offset in offsets:
+				f.seek(offset)
+				record = self._read(f)
+				if record is None:
+					return
+				yield record
+
+	def between(self, start: float, end: float) -> Iterator[Recorded]:
+		"""records received in [start, end), epoch seconds"""
+		first = bisect.bisect_left(self.times, start)
+		last = bisect.bisect_left(self.times, end)
+		return self._records(self.offsets[first:last])
+
+	def uid(self, uid: str) -> Iterator[Recorded]:
+		key = uid.encode()
+		return self._records(
+			[offset for offset, other in zip(self.offsets, self.uids) if other == key]
+		)
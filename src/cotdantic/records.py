@@ -0,0 +1,281 @@
+from .converters import (
+	detect_format,
+	handle_tak_protocal,
+	iter_proto_fields,
+	proto_field,
+	CotFormat,
+)
+from .models import Event, Point, Detail, Contact, Group, Track, Status, epoch2iso, iso2epoch
+from typing import Optional
+from lxml import etree
+import struct
+
+DOUBLE = struct.Struct('<d')
+
+
+def _float(value: Optional[str]) -> Optional[float]:
+	return None if value is None else float(value)
+
+
+class PliRecord:
+	"""compact position report decoded straight from xml or protobuf, without pydantic models
+
+	time and stale are epoch milliseconds. to_event builds a full Event on demand,
+	detail elements other than contact, group, track and status are not kept.
+	from_xml returns None for an event with missing or malformed times, coordinates or detail.
+	"""
+
+	__slots__ = (
+		'uid',
+		'type',
+		'time',
+		'stale',
+		'lat',
+		'lon',
+		'hae',
+		'ce',
+		'le',
+		'callsign',
+		'endpoint',
+		'group_name',
+		'group_role',
+		'speed',
+		'course',
+		'battery',
+	)
+
+	def __init__(
+		self,
+		uid: str,
+		type: str,
+		time: int,
+		stale: int,
+		lat: float,
+		lon: float,
+		hae: float = 999999.0,
+		ce: float = 999999.0,
+		le: float = 999999.0,
+		callsign: Optional[str] = None,
+		endpoint: Optional[str] = None,
+		group_name: Optional[str] = None,
+		group_role: Optional[str] = None,
+		speed: Optional[float] = None,
+		course: Optional[float] = None,
+		battery: Optional[int] = None,
+	):
+		self.uid = uid
+		self.type = type
+		self.time = time
+		self.stale = stale
+		self.lat = lat
+		self.lon = lon
+		self.hae = hae
+		self.ce = ce
+		self.le = le
+		self.callsign = callsign
+		self.endpoint = endpoint
+		self.group_name = group_name
+		self.group_role = group_role
+		self.speed = speed
+		self.course = course
+		self.battery = battery
+
+	def __eq__(self, other) -> bool:
+		if not isinstance(other, PliRecord):
+			return NotImplemented
+		return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+	def __repr__(self) -> str:
+		fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+		return f'PliRecord({fields})'
+
+	@classmethod
+	def from_cot(cls, data: bytes) -> Optional['PliRecord']:
+		cot_format = detect_format(data)
+
+		if cot_format is CotFormat.XML:
+			return cls.from_xml(data)
+
+		if cot_format is not None:
+			return cls.from_proto(data)
+
+		return None
+
+	@classmethod
+	def from_xml(cls, data: bytes) -> Optional['PliRecord']:
+		try:
+			root = etree.fromstring(bytes(data))
+		except etree.XMLSyntaxError:
+			return None
+
+		point = root.find('point')
+		if root.tag != 'event' or point is None:
+			return None
+
+		attrib = root.attrib
+		try:
+			record = cls(
+				uid=attrib.get('uid'),
+				type=attrib.get('type'),
+				time=iso2epoch(attrib.get('time')),
+				stale=iso2epoch(attrib.get('stale')),
+				lat=float(point.get('lat')),
+				lon=float(point.get('lon')),
+				hae=float(point.get('hae', 999999.0)),
+				ce=float(point.get('ce', 999999.0)),
+				le=float(point.get('le', 999999.0)),
+			)
+
+			detail = root.find('detail')
+			if detail is not None:
+				record._update_from_detail(detail)
+		except (TypeError, ValueError):
+			# missing or malformed times, coordinates or detail values
+			return None
+
+		return record
+
+	@classmethod
+	def from_proto(cls, data: bytes) -> Optional['PliRecord']:
+		cot_event = proto_field(handle_tak_protocal(data), 2)
+		if cot_event is None:
+			return None
+
+		record = cls(uid='', type='', time=0, stale=0, lat=0.0, lon=0.0, hae=0.0, ce=0.0, le=0.0)
+		detail = None
+
+		for number, _, value in iter_proto_fields(cot_event):
+			if number == 1:
+				record.type = value.decode()
+			elif number == 5:
+				record.uid = value.decode()
+			elif number == 6:
+				record.time = value
+			elif number == 8:
+				record.stale = value
+			elif number == 10:
+				(record.lat,) = DOUBLE.unpack(value)
+			elif number == 11:
+				(record.lon,) = DOUBLE.unpack(value)
+			elif number == 12:
+				(record.hae,) = DOUBLE.unpack(value)
+			elif number == 13:
+				(record.ce,) = DOUBLE.unpack(value)
+			elif number == 14:
+				(record.le,) = DOUBLE.unpack(value)
+			elif number == 15:
+				detail = value
+
+		if detail is not None:
+			record._update_from_proto_detail(detail)
+
+		return record
+
+	def _update_from_proto_detail(self, detail: bytes):
+		xml_detail = None
+
+		for number, _, value in iter_proto_fields(detail):
+			if number == 1:
+				xml_detail = value
+			elif number == 2:
+				for field, _, item in iter_proto_fields(value):
+					if field == 1:
+						self.endpoint = item.decode() or None
+					elif field == 2:
+						self.callsign = item.decode() or None
+			elif number == 3:
+				for field, _, item in iter_proto_fields(value):
+					if field == 1:
+						self.group_name = item.decode() or None
+					elif field == 2:
+						self.group_role = item.decode() or None
+			elif number == 5:
+				self.battery = None
+				for field, _, item in iter_proto_fields(value):
+					if field == 1:
+						self.battery = item or None
+			elif number == 7:
+				self.speed, self.course = 0.0, 0.0
+				for field, _, item in iter_proto_fields(value):
+					if field == 1:
+						(self.speed,) = DOUBLE.unpack(item)
+					elif field == 2:
+						(self.course,) = DOUBLE.unpack(item)
+
+		# contact and status move into xml_detail when they carry non protobuf attributes
+		if xml_detail:
+			self._update_from_detail(etree.fromstring(b'<detail>' + xml_detail + b'</detail>'))
+
+	def _update_from_detail(self, detail):
+		contact = detail.find('contact')
+		if contact is not None:
+			self.callsign = contact.get('callsign', self.callsign)
+			self.endpoint = contact.get('endpoint', self.endpoint)
+
+		group = detail.find('__group')
+		if group is not None:
+			self.group_name = group.get('name', self.group_name)
+			self.group_role = group.get('role', self.group_role)
+
+		track = detail.find('track')
+		if track is not None:
+			self.speed = _float(track.get('speed', self.speed))
+			self.course = _float(track.get('course', self.course))
+
+		status = detail.find('status')
+		if status is not None and status.get('battery') is not None:
+			self.battery = int(status.get('battery'))
+
+	@classmethod
+	def from_event(cls, event: Event) -> 'PliRecord':
+		detail = event.detail or Detail()
+		contact = detail.contact or Contact()
+		group = detail.group
+		track = detail.track
+		status = detail.status
+
+		return cls(
+			uid=event.uid,
+			type=event.type,
+			time=iso2epoch(event.time),
+			stale=iso2epoch(event.stale),
+			lat=event.point.lat,
+			lon=event.point.lon,
+			hae=event.point.hae,
+			ce=event.point.ce,
+			le=event.point.le,
+			callsign=contact.callsign,
+			endpoint=contact.endpoint,
+			group_name=group.name if group else None,
+			group_role=group.role if group else None,
+			speed=track.speed if track else None,
+			course=track.course if track else None,
+			battery=status.battery if status else None,
+		)
+
+	def to_event(self) -> Event:
+		contact = None
+		if self.callsign is not None or self.endpoint is not None:
+			contact = Contact(callsign=self.callsign, endpoint=self.endpoint)
+
+		group = None
+		if self.group_name is not None or self.group_role is not None:
+			group = Group(name=self.group_name, role=self.group_role)
+
+		track = None
+		if self.speed is not None or self.course is not None:
+			track = Track(speed=self.speed, course=self.course)
+
+		status = None
+		if self.battery is not None:
+			status = Status(battery=self.battery)
+
+		return Event(
+			uid=self.uid,
+			type=self.type,
+			time=epoch2iso(self.time),
+			start=epoch2iso(self.time),
+			stale=epoch2iso(self.stale),
+			point=Point(lat=self.lat, lon=self.lon, hae=self.hae, ce=self.ce, le=self.le),
+			detail=Detail(contact=contact, group=group, track=track, status=status),
+		)
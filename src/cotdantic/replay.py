@@ -0,0 +1,196 @@
+from .recorder import Recorded, CaptureReader, CAPTURE_SUFFIX
+from .converters import detect_format, parse_cot, peek_time, model2message, encode_varint
+from .converters import CotFormat, ProtoVersion
+from .models import epoch2iso, iso2epoch
+from typing import Callable, Iterable, Iterator, List, Optional
+from dataclasses import dataclass, field
+from threading import Event as Signal
+from pathlib import Path
+import time
+
+SPIN = 0.001  # seconds before a deadline spent polling instead of sleeping
+
+
+@dataclass
+class ReplayStats:
+	sent: int = 0
+	failed: int = 0
+	elapsed: float = 0.0
+	jitter: List[float] = field(default_factory=list, repr=False)
+
+	@property
+	def rate(self) -> float:
+		return self.sent / self.elapsed if self.elapsed else 0.0
+
+	@property
+	def mean_jitter(self) -> float:
+		return sum(self.jitter) / len(self.jitter) if self.jitter else 0.0
+
+	@property
+	def max_jitter(self) -> float:
+		return max(self.jitter, default=0.0)
+
+	def percentile(self, fraction: float) -> float:
+		if not self.jitter:
+			return 0.0
+		ordered = sorted(self.jitter)
+		return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def cot_files(directory: Path) -> Iterator[Recorded]:
+	"""every .cot file of a directory in name order, timed by the event time attribute"""
+	last = 0.0
+	for path in sorted(Path(directory).glob('*.cot')):
+		data = path.read_bytes()
+		sent = peek_time(data)
+		last = sent / 1000 if sent is not None else last
+		yield Recorded(last, ('', 0), detect_format(data), data)
+
+
+def replay_source(path: Path) -> Iterator[Recorded]:
+	"""records of a capture file, a recorder directory or a directory of .cot files"""
+	path = Path(path)
+	if path.is_file():
+		yield from CaptureReader(path)
+	elif any(path.glob(f'*{CAPTURE_SUFFIX}')):
+		for capture in sorted(path.glob(f'*{CAPTURE_SUFFIX}')):
+			yield from CaptureReader(capture)
+	else:
+		yield from cot_files(path)
+
+
+def rewrite_times(record: Recorded, now: int) -> bytes:
+	"""move time to now (epoch milliseconds), start and stale keep their offsets from time
+
+	packets are re-encoded in their recorded format, those that do not decode are sent unchanged
+	"""
+	try:
+		event = parse_cot(record.data)
+	except Exception:
+		return record.data
+
+	if event is None:
+		return record.data
+
+	shift = now - iso2epoch(event.time)
+	event.time = epoch2iso(now)
+	event.start = epoch2iso(iso2epoch(event.start) + shift)
+	event.stale = epoch2iso(iso2epoch(event.stale) + shift)
+
+	if record.format is CotFormat.XML:
+		return event.to_xml()
+	if record.format is CotFormat.STREAM:
+		payload = bytes(model2message(event))
+		return ProtoVersion.PROTO.value + encode_varint(len(payload)) + payload
+	return event.to_bytes()
+
+
+class Replayer:
+	"""send recorded packets with their original spacing divided by speed
+
+	speed=None sends as fast as possible. rewrite decodes every packet to move its
+	timestamps to the send time, at the cost of a full decode and encode.
+	send is any callable taking the payload, e.g. MulticastPublisher.send.
+	"""
+
+	def __init__(
+		self, send: Callable[[bytes], None], speed: Optional[float] = 1.0, rewrite: bool = False
+	):
+		self.send = send
+		self.speed = speed
+		self.rewrite = rewrite
+		self.stopped = Signal()
+
+	def stop(self):
+		self.stopped.set()
+
+	def run(self, records: Iterable[Recorded]) -> ReplayStats:
+		stats = ReplayStats()
+		first: Optional[float] = None
+		start = time.perf_counter()
+
+		for record in records:
+			if self.stopped.is_set():
+				break
+
+			if first is None:
+				first = record.time
+
+			if self.speed:
+				deadline = start + max(0.0, record.time - first) / self.speed
+				self._wait(deadline)
+
+			data = record.data
+			if self.rewrite:
+				data = rewrite_times(record, int(time.time() * 1000))
+
+			sent = time.perf_counter()
+			try:
+				self.send(data)
+				stats.sent += 1
+			except OSError:
+				stats.failed += 1
+
+			if self.speed:
+				stats.jitter.append(sent - deadline)
+
+		stats.elapsed = time.perf_counter() - start
+		return stats
+
+	def _wait(self, deadline: float):
+		remaining = deadline - time.perf_counter()
+		if remaining > SPIN:
+			self.stopped.wait(remaining - SPIN)
+		while time.perf_counter() < deadline and not self.stopped.is_set():
+			pass
+
+
+def main():
+	from .multicast import MulticastPublisher, UdpListener
+	import argparse
+
+	parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+	parser.add_argument(
+		'source', type=Path, help='capture file, recorder directory or directory of .cot files'
+	)
+	parser.add_argument('--address', type=str, default='239.2.3.1', help='destination address')
+	parser.add_argument('--port', type=int, default=6969, help='destination port')
+	parser.add_argument('--interface', type=str, default='0.0.0.0', help='multicast interface')
+	parser.add_argument(
+		'--unicast', action='store_true', help='send udp unicast instead of multicast'
+	)
+	parser.add_argument(
+		'--speed', type=float, default=1.0, help='time multiplier, 0 sends as fast as possible'
+	)
+	parser.add_argument(
+		'--rewrite', action='store_true', help='move time/start/stale to the send time'
+	)
+	args = parser.parse_args()
+
+	if args.unicast:
+		publisher = UdpListener(0, args.interface)
+		server = (args.address, args.port)
+		send = lambda data: publisher.send(data, server)  # noqa: E731
+	else:
+		publisher = MulticastPublisher(args.address, args.port, args.interface)
+		send = publisher.send
+
+	with publisher:
+		replayer = Replayer(send, speed=args.speed or None, rewrite=args.rewrite)
+		try:
+			stats = replayer.run(replay_source(args.source))
+		except KeyboardInterrupt:
+			return
+
+	print(
+		f'sent {stats.sent} packets in {stats.elapsed:.2f}s, {stats.rate:.0f}/sec, {stats.failed} failed'
+	)
+	if stats.jitter:
+		print(
+			f'jitter mean {stats.mean_jitter * 1000:.3f} ms, '
+			f'p99 {stats.percentile(0.99) * 1000:.3f} ms, max {stats.max_jitter * 1000:.3f} ms'
+		)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,162 @@
+from typing import Dict, Iterator, List, Set, Tuple
+import heapq
+import math
+
+EARTH_RADIUS = 6371008.8  # meters
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS / 180
+CELL_SIZE = 0.1  # degrees, about 11 km of latitude
+
+Cell = Tuple[int, int]
+
+
+def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+	"""great circle distance in meters"""
+	phi1, phi2 = math.radians(lat1), math.radians(lat2)
+	dphi = phi2 - phi1
+	dlambda = math.radians(lon2 - lon1)
+	a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+	return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bbox(lat: float, lon: float, radius: float) -> Tuple[float, float, float, float]:
+	"""(south, west, north, east) enclosing a circle, west > east when it crosses the antimeridian"""
+	dlat = radius / METERS_PER_DEGREE
+	south, north = lat - dlat, lat + dlat
+
+	if south <= -90 or north >= 90:
+		return max(south, -90.0), -180.0, min(north, 90.0), 180.0
+
+	cos = math.cos(math.radians(max(abs(south), abs(north))))
+	dlon = dlat / cos
+	if dlon >= 180:
+		return south, -180.0, north, 180.0
+
+	west, east = lon - dlon, lon + dlon
+	if west < -180:
+		west += 360
+	if east > 180:
+		east -= 360
+	return south, west, north, east
+
+
+class GridIndex:
+	"""uid positions bucketed into fixed lat/lon cells, updates and removals are O(1)"""
+
+	def __init__(self, cell_size: float = CELL_SIZE):
+		self.cell_size = cell_size
+		self.cells: Dict[Cell, Set[str]] = {}
+		self.positions: Dict[str, Tuple[float, float, Cell]] = {}
+
+	def __len__(self) -> int:
+		return len(self.positions)
+
+	def __contains__(self, uid: str) -> bool:
+		return uid in self.positions
+
+	def cell(self, lat: float, lon: float) -> Cell:
+		return math.floor(lat / self.cell_size), math.floor(lon / self.cell_size)
+
+	def update(self, uid: str, lat: float, lon: float):
+		cell = self.cell(lat, lon)
+		previous = self.positions.get(uid)
+
+		if previous is not None and previous[2] != cell:
+			self._discard(uid, previous[2])
+
+		if previous is None or previous[2] != cell:
+			self.cells.setdefault(cell, set()).add(uid)
+
+		self.positions[uid] = (lat, lon, cell)
+
+	def remove(self, uid: str) -> bool:
+		previous = self.positions.pop(uid, None)
+		if previous is None:
+			return False
+		self._discard(uid, previous[2])
+		return True
+
+	def _discard(self, uid: str, cell: Cell):
+		bucket = self.cells[cell]
+		bucket.discard(uid)
+		if not bucket:
+			del self.cells[cell]
+
+	def _cells(self, south: float, west: float, north: float, east: float) -> Iterator[Set[str]]:
+		rows = range(math.floor(south / self.cell_size), math.floor(north / self.cell_size) + 1)
+		if west <= east:
+			columns = [
+				range(math.floor(west / self.cell_size), math.floor(east / self.cell_size) + 1)
+			]
+		else:
+			columns = [
+				range(math.floor(west / self.cell_size), math.floor(180 / self.cell_size) + 1),
+				range(math.floor(-180 / self.cell_size), math.floor(east / self.cell_size) + 1),
+			]
+
+		# a box larger than the occupied grid is cheaper to answer from the occupied cells
+		if len(rows) * sum(len(column) for column in columns) > len(self.cells):
+			for (row, column), bucket in self.cells.items():
+				if row in rows and any(column in c for c in columns):
+					yield bucket
+			return
+
+		for row in rows:
+			for column_range in columns:
+				for column in column_range:
+					bucket = self.cells.get((row, column))
+					if bucket:
+						yield bucket
+
+	def within_bbox(self, south: float, west: float, north: float, east: float) -> List[str]:
+		"""uids inside the box, west > east crosses the antimeridian"""
+		wraps = west > east
+		found = []
+		for bucket in self._cells(south, west, north, east):
+			for uid in bucket:
+				lat, lon, _ = self.positions[uid]
+				if not south <= lat <= north:
+					continue
+				if (lon >= west or lon <= east) if wraps else (west <= lon <= east):
+					found.append(uid)
+		return found
+
+	def within_radius(self, lat: float, lon: float, radius: float) -> List[Tuple[str, float]]:
+		"""(uid, meters) within radius meters of the point, nearest first"""
+		found = []
+		for uid in self.within_bbox(*radius_bbox(lat, lon, radius)):
+			other_lat, other_lon, _ = self.positions[uid]
+			distance = haversine(lat, lon, other_lat, other_lon)
+			if distance <= radius:
+				found.append((uid, distance))
+		found.sort(key=lambda item: item[1])
+		return found
+
+	def nearest_k(self, lat: float, lon: float, k: int) -> List[Tuple[str, float]]:
+		"""(uid, meters) of the k nearest uids, nearest first"""
+		if k <= 0 or not self.positions:
+			return []
+
+		if k >= len(self.positions):
+			candidates = self.positions
+		else:
+			# grow a square of cells until it holds k uids, the k-th distance bounds the answer
+			row, column = self.cell(lat, lon)
+			candidates = {}
+			ring = 0
+			limit = 360 / self.cell_size
+			while len(candidates) < k and ring <= limit:
+				south, north = (row - ring) * self.cell_size, (row + ring + 1) * self.cell_size
+				west, east = (column - ring) * self.cell_size, (column + ring + 1) * self.cell_size
+				for uid in self.within_bbox(south, max(west, -180.0), north, min(east, 180.0)):
+					candidates[uid] = None
+				ring = ring * 2 + 1
+
+		nearest = heapq.nsmallest(
+			k,
+			((uid, haversine(lat, lon, *self.positions[uid][:2])) for uid in candidates),
+			key=lambda item: item[1],
+		)
+		if len(nearest) < k or candidates is self.positions:
+			return nearest
+
+		return self.within_radius(lat, lon, nearest[-1][1])[:k]
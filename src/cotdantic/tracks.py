@@ -0,0 +1,200 @@
+from .models import Event, iso2epoch
+from typing import Dict, List, Optional
+import numpy as np
+import time
+
+NAN = float('nan')
+INITIAL_CAPACITY = 1024
+
+COLUMNS = {
+	'lat': np.float64,
+	'lon': np.float64,
+	'hae': np.float64,
+	'time': np.int64,
+	'stale': np.int64,
+	'speed': np.float64,
+	'course': np.float64,
+	'callsign': np.int32,
+	'endpoint': np.int32,
+	'active': np.bool_,
+}
+
+
+class Interned:
+	"""string table, each distinct string stored once and referenced by index"""
+
+	def __init__(self):
+		self.values: List[Optional[str]] = [None]
+		self.ids: Dict[Optional[str], int] = {None: 0}
+
+	def intern(self, value: Optional[str]) -> int:
+		index = self.ids.get(value)
+		if index is None:
+			index = self.ids[value] = len(self.values)
+			self.values.append(value)
+		return index
+
+	def __getitem__(self, index: int) -> Optional[str]:
+		return self.values[index]
+
+
+class TrackStore:
+	"""columnar track table, one row per uid
+
+	numeric fields live in numpy columns so expiry and area queries are vectorized,
+	callsigns and endpoints are interned. rows of removed uids are reused.
+	times are epoch milliseconds, missing speed/course are nan.
+	"""
+
+	def __init__(self, capacity: int = INITIAL_CAPACITY):
+		self.capacity = capacity
+		self.columns: Dict[str, np.ndarray] = {
+			name: np.zeros(capacity, dtype) for name, dtype in COLUMNS.items()
+		}
+		self.uids: List[Optional[str]] = [None] * capacity
+		self.index: Dict[str, int] = {}
+		self.free: List[int] = []
+		self.size = 0
+		self.callsigns = Interned()
+		self.endpoints = Interned()
+
+	def __len__(self) -> int:
+		return len(self.index)
+
+	def __contains__(self, uid: str) -> bool:
+		return uid in self.index
+
+	def _grow(self):
+		capacity = self.capacity * 2
+		for name, column in self.columns.items():
+			grown = np.zeros(capacity, column.dtype)
+			grown[: self.capacity] = column
+			self.columns[name] = grown
+		self.uids.extend([None] * (capacity - self.capacity))
+		self.capacity = capacity
+
+	def _row(self, uid: str) -> int:
+		row = self.index.get(uid)
+		if row is not None:
+			return row
+
+		if self.free:
+			row = self.free.pop()
+		else:
+			if self.size == self.capacity:
+				self._grow()
+			row = self.size
+			self.size += 1
+
+		self.index[uid] = row
+		self.uids[row] = uid
+		return row
+
+	def upsert(
+		self,
+		uid: str,
+		lat: float,
+		lon: float,
+		hae: float = 999999.0,
+		time: int = 0,
+		stale: int = 0,
+		callsign: Optional[str] = None,
+		endpoint: Optional[str] = None,
+		speed: Optional[float] = None,
+		course: Optional[float] = None,
+	) -> int:
+		"""insert or overwrite the track of uid, returns its row"""
+		row = self._row(uid)
+		columns = self.columns
+		columns['lat'][row] = lat
+		columns['lon'][row] = lon
+		columns['hae'][row] = hae
+		columns['time'][row] = time
+		columns['stale'][row] = stale
+		columns['speed'][row] = NAN if speed is None else speed
+		columns['course'][row] = NAN if course is None else course
+		columns['callsign'][row] = self.callsigns.intern(callsign)
+		columns['endpoint'][row] = self.endpoints.intern(endpoint)
+		columns['active'][row] = True
+		return row
+
+	def upsert_event(self, event: Event) -> int:
+		detail = event.detail
+		contact = detail.contact if detail is not None else None
+		track = detail.track if detail is not None else None
+		return self.upsert(
+			event.uid,
+			event.point.lat,
+			event.point.lon,
+			event.point.hae,
+			iso2epoch(event.time),
+			iso2epoch(event.stale),
+			callsign=contact.callsign if contact else None,
+			endpoint=contact.endpoint if contact else None,
+			speed=track.speed if track else None,
+			course=track.course if track else None,
+		)
+
+	def upsert_record(self, record) -> int:
+		"""upsert from a records.PliRecord"""
+		return self.upsert(
+			record.uid,
+			record.lat,
+			record.lon,
+			record.hae,
+			record.time,
+			record.stale,
+			callsign=record.callsign,
+			endpoint=record.endpoint,
+			speed=record.speed,
+			course=record.course,
+		)
+
+	def remove(self, uid: str) -> bool:
+		row = self.index.pop(uid, None)
+		if row is None:
+			return False
+		self.columns['active'][row] = False
+		self.uids[row] = None
+		self.free.append(row)
+		return True
+
+	def _uids(self, rows: np.ndarray) -> List[str]:
+		uids = self.uids
+		return [uids[row] for row in rows.tolist()]
+
+	def expire(self, now: Optional[int] = None) -> List[str]:
+		"""remove every track whose stale time has passed, returns their uids"""
+		if now is None:
+			now = int(time.time() * 1000)
+
+		size = self.size
+		rows = np.flatnonzero(self.columns['active'][:size] & (self.columns['stale'][:size] < now))
+		expired = self._uids(rows)
+		for uid in expired:
+			self.remove(uid)
+		return expired
+
+	def within_bbox(self, south: float, west: float, north: float, east: float) -> List[str]:
+		"""uids inside the box, west > east crosses the antimeridian"""
+		size = self.size
+		lat, lon = self.columns['lat'][:size], self.columns['lon'][:size]
+		mask = self.columns['active'][:size] & (lat >= south) & (lat <= north)
+		if west <= east:
+			mask &= (lon >= west) & (lon <= east)
+		else:
+			mask &= (lon >= west) | (lon <= east)
+		return self._uids(np.flatnonzero(mask))
+
+	def get(self, uid: str) -> Optional[dict]:
+		row = self.index.get(uid)
+		if row is None:
+			return None
+
+		track = {
+			name: column[row].item() for name, column in self.columns.items() if name != 'active'
+		}
+		track['uid'] = uid
+		track['callsign'] = self.callsigns[track['callsign']]
+		track['endpoint'] = self.endpoints[track['endpoint']]
+		return track
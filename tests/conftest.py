@@ -0,0 +1,31 @@
+from cotdantic.templates import default_blue_force
+from cotdantic.models import Event, epoch2iso
+from typing import Optional
+import pytest
+
+
+@pytest.fixture
+def blue_force():
+	"""factory of Cyan team PLIs, stale in epoch milliseconds"""
+
+	def factory(
+		uid: str = 'blue',
+		lat: float = 38.69,
+		lon: float = -77.13,
+		callsign: Optional[str] = None,
+		stale: Optional[int] = None,
+	) -> Event:
+		event = default_blue_force(
+			uid=uid,
+			callsign=callsign or uid,
+			group_name='Cyan',
+			group_role='Team Member',
+			address='127.0.0.1',
+			lat=lat,
+			lon=lon,
+		)
+		if stale is not None:
+			event.stale = epoch2iso(stale)
+		return event
+
+	return factory
@@ -0,0 +1,37 @@
+from cotdantic.aio import AsyncUdpListener, AsyncTcpListener
+import asyncio
+
+
+def test_async_udp_stream():
+	async def run():
+		observed = []
+
+		async with AsyncUdpListener(0, '127.0.0.1') as listener:
+			listener.add_observer(observed.append)
+			server = listener.sock.getsockname()
+			stream = listener.__aiter__()
+
+			for i in range(10):
+				listener.send(f'{i}'.encode(), server)
+
+			packets = [await asyncio.wait_for(stream.__anext__(), 2) for _ in range(10)]
+
+		assert [data for data, _ in packets] == [f'{i}'.encode() for i in range(10)]
+		assert observed == packets
+		assert [packet async for packet in stream] == []
+
+	asyncio.run(run())
+
+
+def test_async_tcp_stream():
+	async def run():
+		async with AsyncTcpListener(0, '127.0.0.1') as listener:
+			server = listener.server.sockets[0].getsockname()
+			stream = listener.__aiter__()
+
+			await listener.send(b'<event/>', server)
+			data, _ = await asyncio.wait_for(stream.__anext__(), 2)
+
+		assert data == b'<event/>'
+
+	asyncio.run(run())
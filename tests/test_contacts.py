@@ -0,0 +1,89 @@
+from cotdantic.contacts import Contacts
+from cotdantic.models import iso2epoch
+import time
+
+
+def test_contacts_expiry(blue_force):
+	now = int(time.time() * 1000)
+	contacts = Contacts()
+	removed = []
+	contacts.add_removal_observer(lambda event, server: removed.append(event.uid))
+
+	for i in range(5):
+		event = blue_force(f'uid-{i}', stale=now + 60_000 + i * 1000)
+		contacts.pli_listener(event, ('127.0.0.1', 4242))
+
+	# a refreshed stale time supersedes the scheduled one
+	contacts.pli_listener(blue_force('uid-0', stale=now + 600_000), ('127.0.0.1', 4242))
+
+	assert contacts.expire(now + 62_500) == ['uid-1', 'uid-2']
+	assert removed == ['uid-1', 'uid-2']
+	assert sorted(contacts.contacts) == ['uid-0', 'uid-3', 'uid-4']
+	assert contacts.within_radius(38.69, -77.13, 10) and 'uid-1' not in contacts.index
+	assert contacts.expire(now + 62_500) == []
+	assert contacts.expired == 2
+
+
+def test_contacts_max_entries(blue_force):
+	now = int(time.time() * 1000)
+	contacts = Contacts(max_entries=3)
+	removed = []
+	contacts.add_removal_observer(lambda event, server: removed.append(event.uid))
+
+	for uid in ['a', 'b', 'c']:
+		contacts.pli_listener(blue_force(uid, stale=now + 60_000), ('127.0.0.1', 4242))
+	contacts.pli_listener(blue_force('a', stale=now + 60_000), ('127.0.0.1', 4242))
+	contacts.pli_listener(blue_force('d', stale=now + 60_000), ('127.0.0.1', 4242))
+
+	assert removed == ['b']
+	assert list(contacts.contacts) == ['c', 'a', 'd']
+	assert contacts.evicted == 1
+	assert iso2epoch(contacts.contacts['d'][0].stale) == contacts.stale['d']
+
+
+def test_contacts_coalesce(blue_force):
+	now = int(time.time() * 1000)
+	contacts = Contacts(coalesce=60)
+	diffs = []
+	redraws = []
+	contacts.add_diff_observer(diffs.append)
+	contacts.add_observer(redraws.append)
+
+	contacts.pli_listener(blue_force('a', stale=now + 60_000), ('127.0.0.1', 4242))
+	contacts.flush()
+	assert [diff.added for diff in diffs] == [{'a'}]
+
+	for _ in range(100):
+		contacts.pli_listener(blue_force('a', stale=now + 60_000), ('127.0.0.1', 4242))
+	contacts.pli_listener(blue_force('b', stale=now + 1_000), ('127.0.0.1', 4242))
+	contacts.pli_listener(blue_force('c', stale=now + 60_000), ('127.0.0.1', 4242))
+	contacts.expire(now + 2_000)
+	contacts.expire(now + 61_000)
+	assert len(diffs) == 1
+	contacts.flush()
+
+	# b was added and removed within the window, so observers never hear of it
+	assert diffs[1].added == set()
+	assert diffs[1].updated == set()
+	assert diffs[1].removed == {'a'}
+	assert len(redraws) == 2
+
+	contacts.flush()
+	assert len(diffs) == 2
+
+
+def test_contacts_coalesce_timer(blue_force):
+	now = int(time.time() * 1000)
+	contacts = Contacts(coalesce=0.05)
+	diffs = []
+	contacts.add_diff_observer(diffs.append)
+
+	for uid in ['a', 'b', 'a']:
+		contacts.pli_listener(blue_force(uid, stale=now + 60_000), ('127.0.0.1', 4242))
+
+	deadline = time.time() + 2
+	while not diffs and time.time() < deadline:
+		time.sleep(0.01)
+
+	assert len(diffs) == 1
+	assert diffs[0].added == {'a', 'b'}
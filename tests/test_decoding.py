@@ -0,0 +1,83 @@
+from cotdantic.decoding import ShardedDecoder, ShmRing
+from cotdantic import Event, Point
+import time
+import sys
+
+
+def test_shm_ring_wraps():
+	ring = ShmRing(256)
+	try:
+		for i in range(200):
+			record = bytes([i]) * (i % 60)
+			assert ring.put(record)
+			assert ring.get() == record
+		assert ring.get() is None
+	finally:
+		ring.close()
+
+
+def test_sharded_decoder_order():
+	received = []
+
+	with ShardedDecoder(workers=2) as decoder:
+		decoder.add_observer(received.append)
+		for i in range(60):
+			event = Event(
+				type='a-f-G', uid=f'unit-{i % 5}', how=f'h-{i}', point=Point(lat=1.0, lon=2.0)
+			)
+			decoder.submit((event.to_xml() if i % 2 else bytes(event), ('127.0.0.1', 6969)))
+		decoder.submit((b'garbage', ('127.0.0.1', 6969)))
+
+		end = time.time() + 10
+		while len(received) + decoder.failed < 61 and time.time() < end:
+			time.sleep(0.01)
+
+	assert len(received) == 60
+	assert decoder.failed == 1
+
+	sequences = {}
+	for event, server in received:
+		assert server == ('127.0.0.1', 6969)
+		sequences.setdefault(event.uid, []).append(int(event.how[2:]))
+	assert all(sequence == sorted(sequence) for sequence in sequences.values())
+
+
+def test_sharded_decoder_listeners():
+	from threading import Thread
+
+	received = []
+	threads, count = 4, 100
+
+	def listener(decoder: ShardedDecoder, index: int):
+		for i in range(count):
+			point = Point(lat=1.0, lon=2.0)
+			event = Event(type='a-f-G', uid=f'listener-{index}', how=f'h-{i}', point=point)
+			decoder.submit((bytes(event), ('127.0.0.1', 6969)))
+
+	# switch threads often so unsynchronized ring writes would interleave
+	interval = sys.getswitchinterval()
+	sys.setswitchinterval(1e-6)
+	try:
+		with ShardedDecoder(workers=2) as decoder:
+			decoder.add_observer(received.append)
+			listeners = [Thread(target=listener, args=(decoder, i)) for i in range(threads)]
+			for thread in listeners:
+				thread.start()
+			for thread in listeners:
+				thread.join()
+			sys.setswitchinterval(interval)
+
+			end = time.time() + 10
+			while len(received) + decoder.failed < threads * count and time.time() < end:
+				time.sleep(0.01)
+	finally:
+		sys.setswitchinterval(interval)
+
+	assert decoder.submitted == threads * count
+	assert decoder.failed == 0 and decoder.dropped == 0
+	assert len(received) == threads * count
+
+	sequences = {}
+	for event, _ in received:
+		sequences.setdefault(event.uid, []).append(int(event.how[2:]))
+	assert all(sequence == list(range(count)) for sequence in sequences.values())
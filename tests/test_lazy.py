@@ -0,0 +1,61 @@
+from cotdantic.lazy import LazyEvent, LazyDecodeError
+from cotdantic.converters import parse_cot, encode_varint, ProtoVersion
+from cotdantic.contacts import Converter, Contacts
+from cotdantic import Event, Point, Detail, Link
+import pytest
+
+
+def test_lazy_header_then_detail(blue_force):
+	event = blue_force('lazy', lat=1.5, lon=-2.5)
+	event.detail.link = [Link(uid='parent', relation='p-p')]
+	event.detail.raw_xml = b'<__custom value="1"/>'
+	payload = event.to_bytes()[3:]
+	stream = ProtoVersion.PROTO.value + encode_varint(len(payload)) + payload
+
+	for data in (event.to_xml(), event.to_bytes(), stream):
+		lazy = LazyEvent.from_cot(data)
+		full = parse_cot(data)
+
+		assert (lazy.uid, lazy.type, lazy.how) == (full.uid, full.type, full.how)
+		assert (lazy.time, lazy.start, lazy.stale) == (full.time, full.start, full.stale)
+		assert lazy.point == full.point
+		assert not lazy.decoded
+
+		assert lazy.detail == full.detail
+		assert lazy.decoded
+		assert lazy == full
+		assert lazy.to_xml() == full.to_xml()
+
+
+def test_lazy_invalid():
+	assert LazyEvent.from_cot(b'garbage') is None
+	assert LazyEvent.from_cot(b'<event') is None
+	assert LazyEvent.from_cot(b'<other/>') is None
+
+
+def test_converter_lazy():
+	received = []
+	converter = Converter(lazy=True)
+	converter.add_observer(lambda event, server: received.append(event))
+
+	event = Event(type='a-h-G', point=Point(lat=1, lon=2), detail=Detail())
+	converter.process_observers((event.to_bytes(), ('127.0.0.1', 4242)))
+
+	assert isinstance(received[0], LazyEvent)
+	assert received[0].uid == event.uid and not received[0].decoded
+
+
+def test_converter_lazy_invalid_detail(blue_force):
+	contacts = Contacts()
+	converter = Converter(lazy=True)
+	converter.add_observer(contacts.pli_listener)
+
+	bad = blue_force('bad').to_xml().replace(b'</detail>', b'<track speed="abc"/></detail>')
+	with pytest.raises(LazyDecodeError):
+		LazyEvent.from_cot(bad).detail
+
+	converter.process_observers((bad, ('127.0.0.1', 4242)))
+	converter.process_observers((blue_force('good').to_xml(), ('127.0.0.1', 4242)))
+
+	assert converter.observers == [contacts.pli_listener]
+	assert list(contacts.contacts) == ['good']
@@ -0,0 +1,28 @@
+from cotdantic.converters import parse_cot
+from cotdantic.loadgen import LoadGenerator
+
+
+def test_load_generator_moves_units():
+	sent = []
+	generator = LoadGenerator(sent.append, units=5, rate=200, speed=1000.0, route=True)
+	stats = generator.run(duration=0.25)
+
+	assert stats.sent == len(sent) and 30 < stats.sent <= 51
+	assert {parse_cot(data).uid for data in sent} == {f'cotdantic-load-{i}' for i in range(5)}
+
+	first, last = parse_cot(sent[0]), parse_cot(sent[(len(sent) - 1) // 5 * 5])
+	assert first.uid == last.uid
+	assert (first.point.lat, first.point.lon) != (last.point.lat, last.point.lon)
+
+
+def test_load_generator_counts_rejected():
+	calls = []
+
+	def send(data: bytes) -> bool:
+		# a full send queue rejects every other packet
+		calls.append(data)
+		return len(calls) % 2 == 0
+
+	stats = LoadGenerator(send, units=2, rate=200).run(duration=0.1)
+	assert stats.sent + stats.failed == len(calls)
+	assert stats.sent == len(calls) // 2
@@ -0,0 +1,312 @@
+from cotdantic.multicast import (
+	TcpConnectionPool,
+	StreamFramer,
+	UdpListener,
+	TcpListener,
+	FrameError,
+	Deduplicator,
+	Dispatcher,
+	Publisher,
+	DedupKey,
+	RecvRing,
+	recv_batch,
+	Overflow,
+)
+from cotdantic.converters import model2message, parse_cot
+from cotdantic import Event, Point
+from threading import Event as Signal
+import platform
+import pytest
+import socket
+import time
+
+
+def wait_for(condition, timeout: float = 2.0):
+	end = time.time() + timeout
+	while not condition() and time.time() < end:
+		time.sleep(0.01)
+	return condition()
+
+
+def test_udp_batch_receive():
+	received = []
+
+	with UdpListener(0, '127.0.0.1', batch=8) as listener:
+		listener.add_observer(received.append)
+		server = listener.sock.getsockname()
+
+		with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+			for i in range(100):
+				sock.sendto(f'{i}'.encode(), server)
+
+		assert wait_for(lambda: len(received) == 100)
+		assert [data for data, _ in received] == [f'{i}'.encode() for i in range(100)]
+		assert listener.received == 100
+		assert listener.rcvbuf > 2**8
+
+		if platform.system() == 'Linux':
+			assert listener.drops == 0
+
+
+def test_udp_ring_receive():
+	received = []
+	event = Event(type='a-f-G', point=Point(lat=1.0, lon=2.0))
+
+	with UdpListener(0, '127.0.0.1', ring=RecvRing()) as listener:
+		listener.add_observer(lambda packet: received.append(Event.from_cot(packet[0])))
+		server = listener.sock.getsockname()
+
+		with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+			sock.sendto(event.to_xml(), server)
+			sock.sendto(bytes(event), server)
+
+		assert wait_for(lambda: len(received) == 2)
+
+	assert [model.uid for model in received] == [event.uid] * 2
+
+
+def test_recv_ring_lifetime():
+	ring = RecvRing(0)
+	payloads = [bytes([i]) * 40_000 for i in range(3)]
+
+	with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as receiver:
+		receiver.bind(('127.0.0.1', 0))
+		with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+			for payload in payloads:
+				sock.sendto(payload, receiver.getsockname())
+		time.sleep(0.05)
+
+		# the third datagram would wrap over the first, it waits for the next batch
+		first = [bytes(data) for data, _ in recv_batch(receiver, 64, ring)]
+		assert len(first) == 2
+		second = [bytes(data) for data, _ in recv_batch(receiver, 64, ring)]
+	assert first + second == payloads
+
+	UdpListener(0, '127.0.0.1', ring=ring)
+	with pytest.raises(ValueError):
+		UdpListener(0, '127.0.0.1', ring=ring)
+
+
+def test_dispatcher_copies_views():
+	received = []
+	publisher = Publisher()
+	publisher.add_observer(received.append)
+	publisher.set_deduplicator(Deduplicator())
+
+	buffer = bytearray(Event(uid='view', type='a-f-G', point=Point(lat=1, lon=2)).to_bytes())
+	with Dispatcher() as dispatcher:
+		publisher.set_dispatcher(dispatcher)
+		publisher.process_observers((memoryview(buffer), ('127.0.0.1', 4242)))
+		assert wait_for(lambda: len(received) == 1)
+
+	buffer[:] = bytes(len(buffer))
+	assert isinstance(received[0][0], bytes) and Event.from_bytes(received[0][0]).uid == 'view'
+
+
+def stream_proto(event: Event) -> bytes:
+	message = bytes(model2message(event))
+	assert len(message) < 128
+	return b'\xbf' + bytes([len(message)]) + message
+
+
+def test_stream_framer():
+	event = Event(type='a-f-G', point=Point(lat=1.0, lon=2.0))
+	xml = event.to_xml()
+	proto = stream_proto(event)
+	stream = b'<?xml version="1.0"?>' + xml + b'\n' + proto + xml
+
+	framer = StreamFramer()
+	frames = []
+	for i in range(0, len(stream), 7):
+		frames.extend(framer.feed(stream[i : i + 7]))
+
+	assert frames == [b'<?xml version="1.0"?>' + xml, proto, xml]
+	assert Event.from_cot(frames[1]).uid == event.uid
+	assert framer.flush() == b''
+
+	mesh = bytes(event)
+	assert framer.feed(mesh) == []
+	assert framer.flush() == mesh
+
+	framer = StreamFramer(max_size=16)
+	with pytest.raises(FrameError):
+		framer.feed(b'<event>' + b' ' * 32)
+
+
+def test_tcp_framed_persistent_connection():
+	received = []
+	event = Event(type='a-f-G', point=Point(lat=1.0, lon=2.0))
+
+	with TcpListener(0, '127.0.0.1', framed=True) as listener:
+		listener.add_observer(received.append)
+		server = listener.recv_sock.getsockname()
+
+		with socket.create_connection(server) as first, socket.create_connection(server) as second:
+			first.sendall(event.to_xml()[:10])
+			second.sendall(event.to_xml())
+			assert wait_for(lambda: len(received) == 1)
+
+			first.sendall(event.to_xml()[10:] + stream_proto(event))
+			assert wait_for(lambda: len(received) == 3)
+
+	assert [Event.from_cot(data).uid for data, _ in received] == [event.uid] * 3
+
+
+def test_tcp_connection_pool():
+	received = []
+	event = Event(type='a-f-G', point=Point(lat=1.0, lon=2.0))
+
+	with TcpListener(0, '127.0.0.1', framed=True) as listener, TcpConnectionPool() as pool:
+		listener.add_observer(received.append)
+		server = listener.recv_sock.getsockname()
+		pool.set_framed(server)
+
+		for _ in range(3):
+			pool.send(event.to_xml(), server)
+		assert wait_for(lambda: len(received) == 3)
+		assert pool.connects == 1
+
+		sock, _ = pool.connections[server]
+		sock.close()
+		pool.send(event.to_xml(), server)
+		assert wait_for(lambda: len(received) == 4)
+		assert pool.connects == 2
+
+		sender = TcpListener(0, '127.0.0.1', pool=pool)
+		for _ in range(10):
+			sender.send(event.to_xml(), server)
+		assert wait_for(lambda: len(received) == 14)
+
+	assert pool.connections == {}
+
+
+@pytest.mark.parametrize('framed', [True, False])
+def test_tcp_connection_pool_unframed(framed):
+	received = []
+	events = [Event(uid=f'u{i}', type='a-f-G', point=Point(lat=1.0, lon=2.0)) for i in range(3)]
+
+	with TcpListener(0, '127.0.0.1', framed=framed) as listener, TcpConnectionPool() as pool:
+		listener.add_observer(received.append)
+		server = listener.recv_sock.getsockname()
+
+		# servers are not assumed to frame, each message gets its own connection
+		for event in events:
+			pool.send_nowait(event.to_xml(), server)
+		assert wait_for(lambda: len(received) == 3)
+		assert pool.connections == {}
+
+		# mesh protobuf has no length, it never shares a connection even with a framed server
+		pool.set_framed(server)
+		for event in events:
+			pool.send_nowait(event.to_bytes(), server)
+		assert wait_for(lambda: len(received) == 6)
+		assert pool.connections == {}
+
+	assert sorted(parse_cot(data).uid for data, _ in received[:3]) == ['u0', 'u1', 'u2']
+	assert sorted(parse_cot(data).uid for data, _ in received[3:]) == ['u0', 'u1', 'u2']
+
+
+@pytest.mark.parametrize(
+	'overflow, expected',
+	[
+		(Overflow.DROP_OLDEST, [0, 8, 9]),
+		(Overflow.DROP_NEWEST, [0, 1, 2]),
+	],
+)
+def test_dispatcher_overflow(overflow, expected):
+	release = Signal()
+	received = []
+
+	def slow(data):
+		release.wait(2)
+		received.append(data)
+
+	publisher = Publisher()
+	publisher.add_observer(slow)
+
+	with Dispatcher(maxsize=2, overflow=overflow) as dispatcher:
+		publisher.set_dispatcher(dispatcher)
+		publisher.process_observers(0)
+		assert wait_for(lambda: dispatcher.depth == 0)
+
+		for i in range(1, 10):
+			publisher.process_observers(i)
+		release.set()
+
+	assert received == expected
+	metrics = dispatcher.metrics()
+	assert metrics['dropped'] == 7
+	assert metrics['max_depth'] == 2
+	assert metrics['observers']['slow'].calls == 3
+
+
+def test_dispatcher_block():
+	received = []
+	publisher = Publisher()
+	publisher.add_observer(lambda data: time.sleep(0.001) or received.append(data))
+
+	with Dispatcher(maxsize=2, overflow=Overflow.BLOCK) as dispatcher:
+		publisher.set_dispatcher(dispatcher)
+		for i in range(20):
+			publisher.process_observers(i)
+
+	assert received == list(range(20))
+	assert dispatcher.dropped == 0
+
+
+def touch(directory, data):
+	time.sleep(0.2)
+	(directory / str(data)).touch()
+
+
+def test_dispatcher_processes(tmp_path, caplog):
+	from cotdantic.contacts import Converter
+	from functools import partial
+
+	publisher = Publisher()
+	publisher.add_observer(partial(touch, tmp_path))
+	publisher.add_observer(Converter().process_observers)
+
+	start = time.perf_counter()
+	with Dispatcher(processes=4) as dispatcher:
+		publisher.set_dispatcher(dispatcher)
+		for i in range(4):
+			publisher.process_observers(i)
+		assert wait_for(lambda: len(list(tmp_path.iterdir())) == 4)
+	elapsed = time.perf_counter() - start
+
+	# one worker thread still keeps every process busy
+	assert elapsed < 0.7
+	assert sorted(path.name for path in tmp_path.iterdir()) == ['0', '1', '2', '3']
+
+	# stateful observers would only update a copy in the child
+	assert len(publisher.observers) == 1
+	assert 'Removing Observer (process_observers)' in caplog.text
+
+
+def test_deduplicator():
+	event = Event(uid='dedup', type='a-f-G', point=Point(lat=1, lon=2))
+	xml, proto = event.to_xml(), event.to_bytes()
+
+	publisher = Publisher()
+	received = []
+	publisher.add_observer(received.append)
+	publisher.set_deduplicator(Deduplicator())
+
+	for data in (xml, proto, xml, b'junk', b'junk', b'other'):
+		publisher.process_observers((data, ('127.0.0.1', 4242)))
+
+	# the same event arriving as xml and protobuf is one event
+	assert [data for data, _ in received] == [xml, b'junk', b'other']
+	assert publisher.deduplicator.hits == 3
+	assert publisher.deduplicator.hit_rate == 0.5
+
+	payload = Deduplicator(key=DedupKey.PAYLOAD)
+	assert not payload.seen(xml) and not payload.seen(proto) and payload.seen(memoryview(xml))
+
+	bounded = Deduplicator(ttl=0.05, maxsize=2)
+	assert not bounded.seen(b'a') and not bounded.seen(b'b') and not bounded.seen(b'c')
+	assert not bounded.seen(b'a')
+	assert bounded.seen(b'c')
+	time.sleep(0.1)
+	assert not bounded.seen(b'c')
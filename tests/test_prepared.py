@@ -0,0 +1,37 @@
+from cotdantic.prepared import PreparedEvent
+from cotdantic.converters import ProtoVersion, parse_cot
+
+
+def test_prepared_event_matches_to_bytes(blue_force):
+	event = blue_force('prepared', lat=1.0, lon=2.0)
+	prepared = PreparedEvent(event)
+
+	decoded = parse_cot(prepared.to_bytes(1_700_000_000_000, lat=3.5, lon=-4.25, hae=10.0))
+	assert decoded.uid == 'prepared'
+	assert (decoded.point.lat, decoded.point.lon, decoded.point.hae) == (3.5, -4.25, 10.0)
+	assert decoded.time == decoded.start == '2023-11-14T22:13:20.000000Z'
+	assert decoded.detail.contact.callsign == 'prepared'
+
+	event.point.lat, event.point.lon, event.point.hae = 3.5, -4.25, 10.0
+	event.time = event.start = decoded.time
+	event.stale = decoded.stale
+	assert prepared.to_bytes(1_700_000_000_000) == event.to_bytes()
+
+	stream = PreparedEvent(event, ProtoVersion.PROTO)
+	assert parse_cot(stream.to_bytes(1_700_000_000_000)) == decoded
+
+
+def test_prepared_event_xml(blue_force):
+	event = blue_force('prepared', lat=1.0, lon=2.0)
+	prepared = PreparedEvent(event)
+
+	xml = prepared.to_xml(1_700_000_000_000, lat=3.5, lon=-4.25)
+	decoded = parse_cot(xml)
+	assert (decoded.point.lat, decoded.point.lon) == (3.5, -4.25)
+	assert decoded.time == decoded.start == '2023-11-14T22:13:20.000000Z'
+
+	event.point.lat, event.point.lon = 3.5, -4.25
+	event.time = event.start = decoded.time
+	event.stale = decoded.stale
+	assert xml == event.to_xml()
+	assert parse_cot(prepared.to_bytes(1_700_000_000_000)) == decoded
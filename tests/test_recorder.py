@@ -0,0 +1,38 @@
+from cotdantic.recorder import Recorder, CaptureReader, capture_files, read_captures
+from cotdantic.converters import CotFormat
+from cotdantic import Event, Point
+
+
+def test_recorder_rotation_and_index(tmp_path):
+	events = [Event(uid=f'uid-{i % 3}', type='a-f-G', point=Point(lat=i, lon=i)) for i in range(30)]
+	packets = [
+		(event.to_xml() if i % 2 else event.to_bytes(), ('127.0.0.1', 4242))
+		for i, event in enumerate(events)
+	]
+
+	with Recorder(tmp_path, max_size=2048, fsync_interval=0.01) as recorder:
+		for packet in packets:
+			recorder.record(packet)
+		recorder.record((memoryview(b'junk'), ('10.0.0.1', 17012)))
+
+	assert recorder.recorded == 31
+	assert recorder.dropped == 0
+	assert len(capture_files(tmp_path)) == recorder.files > 1
+
+	records = list(read_captures(tmp_path))
+	assert [record.data for record in records] == [data for data, _ in packets] + [b'junk']
+	assert records[0].format is CotFormat.MESH
+	assert records[1].format is CotFormat.XML
+	assert records[-1].format is None
+	assert records[-1].server == ('10.0.0.1', 17012)
+
+	readers = [CaptureReader(path) for path in capture_files(tmp_path)]
+	assert sum(len(reader) for reader in readers) == 31
+
+	by_uid = [record.data for reader in readers for record in reader.uid('uid-1')]
+	assert by_uid == [data for i, (data, _) in enumerate(packets) if i % 3 == 1]
+
+	middle = records[10].time
+	assert [
+		record.data for reader in readers for record in reader.between(middle, float('inf'))
+	] == [record.data for record in records if record.time >= middle]
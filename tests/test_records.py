@@ -0,0 +1,55 @@
+from cotdantic.records import PliRecord
+from cotdantic import *
+
+
+def pli_event() -> Event:
+	return Event(
+		uid='Delta1',
+		type='a-f-G-U-C-I',
+		point=Point(lat=38.69, lon=-77.13, hae=10, ce=5.0, le=10.0),
+		detail=Detail(
+			contact=Contact(
+				callsign='Delta1', endpoint='192.168.0.100:4242:tcp', phone='+12223334444'
+			),
+			group=Group(name='Cyan', role='Team Member'),
+			track=Track(speed=1.5, course=90),
+			status=Status(battery=50),
+			takv=Takv(device='virtual', platform='virtual', os='linux', version='1.0.0'),
+		),
+	)
+
+
+def test_pli_record_decode():
+	event = pli_event()
+	expected = PliRecord.from_event(event)
+
+	assert PliRecord.from_cot(event.to_xml()) == expected
+	assert PliRecord.from_cot(event.to_bytes()) == expected
+	assert expected.callsign == 'Delta1'
+	assert expected.battery == 50
+	assert expected.speed == 1.5
+
+	assert PliRecord.from_cot(b'not a cot message') is None
+	assert PliRecord.from_cot(b'<event') is None
+
+
+def test_pli_record_invalid_xml():
+	xml = pli_event().to_xml()
+	for old, new in [
+		(b' stale=', b' expires='),
+		(b' lat=', b' latitude='),
+		(b' time="', b' time="yesterday'),
+		(b'speed="1.5"', b'speed="abc"'),
+	]:
+		assert new in xml.replace(old, new, 1)
+		assert PliRecord.from_cot(xml.replace(old, new, 1)) is None
+
+
+def test_pli_record_to_event():
+	record = PliRecord.from_cot(pli_event().to_bytes())
+	event = record.to_event()
+
+	assert event.detail.contact.endpoint == '192.168.0.100:4242:tcp'
+	assert event.detail.group.name == 'Cyan'
+	assert PliRecord.from_event(event) == record
+	assert PliRecord.from_cot(event.to_bytes()) == record
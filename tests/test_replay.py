@@ -0,0 +1,69 @@
+from cotdantic.replay import Replayer, replay_source, rewrite_times
+from cotdantic.recorder import Recorded, Recorder
+from cotdantic.converters import detect_format, encode_varint, CotFormat, ProtoVersion
+from cotdantic.models import iso2epoch
+from cotdantic import Event, Point
+import time
+
+
+def test_replay_timing():
+	records = [Recorded(100.0 + i * 0.05, ('127.0.0.1', 4242), None, bytes([i])) for i in range(5)]
+
+	sent = []
+	stats = Replayer(sent.append, speed=2.0).run(records)
+	assert sent == [bytes([i]) for i in range(5)]
+	assert stats.sent == 5
+	assert 0.09 < stats.elapsed < 0.5
+	assert len(stats.jitter) == 5 and stats.max_jitter < 0.05
+
+	stats = Replayer(sent.append, speed=None).run(records)
+	assert stats.elapsed < 0.05
+	assert stats.jitter == []
+
+
+def test_replay_sources(tmp_path):
+	event = Event(
+		uid='replay', type='a-f-G', point=Point(lat=1, lon=2), time='2020-01-01T00:00:00.000000Z'
+	)
+	event.start = event.time
+	event.stale = '2020-01-01T00:05:00.000000Z'
+
+	(tmp_path / 'cot').mkdir()
+	(tmp_path / 'cot' / 'a.cot').write_bytes(event.to_xml())
+	records = list(replay_source(tmp_path / 'cot'))
+	assert records[0].time == iso2epoch(event.time) / 1000
+	assert records[0].format is CotFormat.XML
+
+	with Recorder(tmp_path / 'capture') as recorder:
+		recorder.record((event.to_bytes(), ('127.0.0.1', 4242)))
+	assert [record.data for record in replay_source(tmp_path / 'capture')] == [event.to_bytes()]
+
+	now = int(time.time() * 1000)
+	rewritten = Event.from_cot(rewrite_times(records[0], now))
+	assert iso2epoch(rewritten.time) == now
+	assert iso2epoch(rewritten.stale) - now == 300_000
+
+
+def test_rewrite_times_formats():
+	event = Event(
+		uid='replay', type='a-f-G', point=Point(lat=1, lon=2), time='2020-01-01T00:00:00.000000Z'
+	)
+	event.start = event.time
+	event.stale = '2020-01-01T00:05:00.000000Z'
+
+	payload = event.to_bytes()[3:]
+	stream = ProtoVersion.PROTO.value + encode_varint(len(payload)) + payload
+	now = int(time.time() * 1000)
+	rewritten = rewrite_times(Recorded(0.0, ('', 0), CotFormat.STREAM, stream), now)
+	assert detect_format(rewritten) is CotFormat.STREAM
+	assert iso2epoch(Event.from_cot(rewritten).time) == now
+
+	# well formed xml that is not an event is sent unchanged instead of stopping the replay
+	records = [
+		Recorded(0.0, ('', 0), CotFormat.XML, b'<other/>'),
+		Recorded(0.0, ('', 0), CotFormat.XML, event.to_xml()),
+	]
+	sent = []
+	stats = Replayer(sent.append, speed=None, rewrite=True).run(records)
+	assert stats.sent == 2
+	assert sent[0] == b'<other/>'
@@ -0,0 +1,94 @@
+from cotdantic.spatial import GridIndex, haversine
+from cotdantic.contacts import Contacts
+from threading import Thread
+import random
+import sys
+
+
+def brute_radius(positions, lat, lon, radius):
+	return sorted(uid for uid, point in positions.items() if haversine(lat, lon, *point) <= radius)
+
+
+def test_grid_index_queries():
+	rng = random.Random(7)
+	index = GridIndex()
+	positions = {}
+
+	for i in range(3000):
+		if i % 2:
+			point = (rng.uniform(38, 39), rng.uniform(-78, -77))
+		else:
+			point = (rng.uniform(-89, 89), rng.uniform(-180, 180))
+		positions[f'uid-{i}'] = point
+		index.update(f'uid-{i}', *point)
+
+	# moves and removals keep the buckets consistent
+	for i in range(0, 3000, 7):
+		positions[f'uid-{i}'] = (rng.uniform(38, 39), rng.uniform(-78, -77))
+		index.update(f'uid-{i}', *positions[f'uid-{i}'])
+	for i in range(0, 3000, 11):
+		assert index.remove(f'uid-{i}')
+		del positions[f'uid-{i}']
+	assert len(index) == len(positions)
+
+	for lat, lon in [(38.5, -77.5), (0.0, 179.99), (89.5, 10.0)]:
+		for radius in [2000, 50000, 3000000]:
+			found = index.within_radius(lat, lon, radius)
+			assert sorted(uid for uid, _ in found) == brute_radius(positions, lat, lon, radius)
+			assert [d for _, d in found] == sorted(d for _, d in found)
+
+		for k in [1, 10]:
+			brute = sorted(positions, key=lambda uid: haversine(lat, lon, *positions[uid]))[:k]
+			assert [uid for uid, _ in index.nearest_k(lat, lon, k)] == brute
+
+	expected = sorted(
+		uid
+		for uid, (lat, lon) in positions.items()
+		if -10 <= lat <= 10 and (lon >= 170 or lon <= -170)
+	)
+	assert sorted(index.within_bbox(-10, 170, 10, -170)) == expected
+
+
+def test_contacts_spatial(blue_force):
+	contacts = Contacts()
+	for i, lat in enumerate([38.0, 38.01, 40.0]):
+		event = blue_force(f'uid-{i}', lat=lat, lon=-77.0, callsign=f'unit-{i}')
+		contacts.pli_listener(event, ('127.0.0.1', 4242))
+
+	assert [uid for uid, _ in contacts.within_radius(38.0, -77.0, 5000)] == ['uid-0', 'uid-1']
+	assert [uid for uid, _ in contacts.nearest_k(39.9, -77.0, 1)] == ['uid-2']
+	assert sorted(contacts.within_bbox(37, -78, 39, -76)) == ['uid-0', 'uid-1']
+
+	contacts.expire(now=2**62)
+	assert contacts.within_radius(38.0, -77.0, 5000) == []
+
+
+def test_contacts_spatial_threads(blue_force):
+	contacts = Contacts()
+	events = [blue_force(f'uid-{i}', lat=38.0 + (i % 50) * 0.05, lon=-77.0) for i in range(500)]
+	errors = []
+
+	def query():
+		try:
+			for _ in range(200):
+				contacts.within_radius(38.5, -77.0, 100_000)
+				contacts.within_bbox(37, -78, 40, -76)
+				contacts.nearest_k(38.5, -77.0, 5)
+		except Exception as e:
+			errors.append(e)
+
+	# queries from other threads must not see the index mid update
+	interval = sys.getswitchinterval()
+	sys.setswitchinterval(1e-6)
+	try:
+		reader = Thread(target=query)
+		reader.start()
+		while reader.is_alive():
+			for event in events:
+				contacts.pli_listener(event, ('127.0.0.1', 4242))
+			contacts.expire(now=2**62)
+		reader.join()
+	finally:
+		sys.setswitchinterval(interval)
+
+	assert errors == []
@@ -125,6 +125,120 @@ def test_custom_detail():
 	assert model == custom_event
 
 
+def test_custom_detail_list():
+	from cotdantic.converters import model2message
+	from pydantic_xml import attr, element
+	from typing import List, Optional
+
+	class Item(CotBase, tag='item'):
+		name: Optional[str] = attr(default=None)
+
+	class ItemDetail(Detail):
+		items: Optional[List[Item]] = element(default=None)
+
+	class ItemEvent(EventBase[ItemDetail]):
+		pass
+
+	assert 'item' in ItemDetail.tags()
+
+	event = ItemEvent(type='a-f-G', point=Point(lat=1, lon=2), detail=ItemDetail())
+	message = model2message(event)
+	message.cot_event.detail.xml_detail = '<item name="a"/><item name="b"/>'
+	model = ItemEvent.from_bytes(b'\xbf\x01\xbf' + bytes(message))
+	assert [item.name for item in model.detail.items] == ['a', 'b']
+	assert model.detail.raw_xml == b''
+
+	assert b'<item name="a"/><item name="b"/>' in model.to_bytes()
+	assert ItemEvent.from_bytes(model.to_bytes()) == model
+
+
+def test_detect_format():
+	from cotdantic.converters import detect_format, CotFormat, ProtoVersion
+
+	event = default_cot()
+	assert detect_format(event.to_xml()) is CotFormat.XML
+	assert detect_format(b'\xef\xbb\xbf\n  ' + event.to_xml()) is CotFormat.XML
+	assert detect_format(bytes(event)) is CotFormat.MESH
+	assert detect_format(ProtoVersion.PROTO.value + b'\x12') is CotFormat.STREAM
+	assert detect_format(b'') is None
+	assert detect_format(b'garbage') is None
+
+
+def test_parse_cot():
+	event = default_cot()
+	assert Event.from_cot(event.to_xml()) == event
+	assert Event.from_cot(bytes(event)).uid == event.uid
+	assert Event.from_cot(b'<event') is None
+	assert Event.from_cot(b'garbage') is None
+
+
+def test_proto_raw_xml():
+	event_src = default_cot()
+	event_src.detail.raw_xml = b'<first a="1"/><second><inner/></second><first a="2"/>'
+	event_dst = Event.from_bytes(bytes(event_src))
+	assert event_dst.detail.raw_xml == event_src.detail.raw_xml
+	assert event_dst.detail.usericon == event_src.detail.usericon
+
+
+def test_raw_xml_nested():
+	event = default_cot()
+	event.detail.raw_xml = (
+		b'<route><cues><cue id="1"><trigger mode="r"/></cue></cues></route><end/>'
+	)
+	xml = event.to_xml()
+	assert b'<route><cues><cue id="1"><trigger mode="r"/></cue></cues></route><end/>' in xml
+
+	# the cached elements are shared, a second serialization must not duplicate them
+	assert event.to_xml() == xml
+	assert Event.from_bytes(bytes(event)).detail.raw_xml == event.detail.raw_xml
+
+
+def test_proto_empty_xml_detail():
+	point = Point(lat=1.0, lon=2.0)
+	detail = Detail(
+		contact=Contact(callsign='Delta1'), group=Group(name='Cyan', role='Team Member')
+	)
+	event_src = Event(type='a-f-G', point=point, detail=detail)
+	event_dst = Event.from_bytes(bytes(event_src))
+	assert event_dst.detail.raw_xml == b''
+	assert event_dst.detail.contact == event_src.detail.contact
+	assert event_dst.detail.group == event_src.detail.group
+
+
+def test_converter_shared_event():
+	from cotdantic.contacts import Converter
+
+	received = []
+	converter = Converter()
+	converter.add_observer(lambda event, server: received.append(event))
+	converter.add_observer(lambda event, server: received.append(event))
+	converter.process_observers((bytes(default_cot()), ('127.0.0.1', 4242)))
+
+	assert len(received) == 2
+	assert received[0] is received[1]
+
+
+def test_timestamps():
+	assert iso2epoch('2024-10-12T20:42:31.12Z') == 1728765751120
+	assert iso2epoch('2024-10-12T20:42:31Z') == 1728765751000
+	assert iso2epoch('2024-10-12T20:42:31.123456Z') == 1728765751123
+	assert epoch2iso(1728765751120) == '2024-10-12T20:42:31.120000Z'
+	assert epoch2iso(0) == '1970-01-01T00:00:00.000000Z'
+	assert isos2epochs(epochs2isos([0, 1728765751120])) == [0, 1728765751120]
+
+	with pytest.raises(ValueError):
+		iso2epoch('2024-13-12T20:42:31Z')
+
+
+def test_timestamps_numpy():
+	np = pytest.importorskip('numpy')
+
+	epochs = np.array([0, 1728765751120], dtype=np.int64)
+	isos = epochs2isos(epochs)
+	assert list(isos) == [epoch2iso(0), epoch2iso(1728765751120)]
+	assert (isos2epochs(isos) == epochs).all()
+
+
 def test_cot_types():
 	assert str(atom.hostile.ground.civilian) == 'a-h-G-C'
 
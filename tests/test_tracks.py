@@ -0,0 +1,50 @@
+from cotdantic.contacts import Contacts
+from cotdantic.models import iso2epoch
+import pytest
+
+pytest.importorskip('numpy')
+from cotdantic.tracks import TrackStore  # noqa: E402
+
+
+def test_track_store():
+	store = TrackStore(capacity=4)
+	for i in range(10):
+		store.upsert(f'uid-{i}', lat=i, lon=-i, time=i, stale=100 + i, callsign='shared')
+
+	store.upsert('uid-3', lat=50, lon=50, stale=1000, callsign='moved', speed=2.5)
+	assert len(store) == 10
+	assert store.capacity == 16
+	assert store.callsigns.values == [None, 'shared', 'moved']
+	assert store.get('uid-3')['lat'] == 50
+	assert store.get('uid-3')['speed'] == 2.5
+
+	assert sorted(store.within_bbox(2, -5, 5, 0)) == ['uid-2', 'uid-4', 'uid-5']
+	assert store.within_bbox(40, 170, 60, -170) == []
+	assert store.within_bbox(40, 40, 60, 60) == ['uid-3']
+
+	expired = store.expire(now=105)
+	assert sorted(expired) == ['uid-0', 'uid-1', 'uid-2', 'uid-4']
+	assert 'uid-0' not in store
+	assert store.get('uid-0') is None
+
+	store.upsert('new', lat=0, lon=0, stale=1000)
+	assert store.size == 10
+
+
+def test_contacts_tracks(blue_force):
+	contacts = Contacts(tracks=TrackStore())
+	event = blue_force()
+	contacts.pli_listener(event, ('127.0.0.1', 4242))
+
+	assert contacts.within_bbox(38, -78, 39, -77) == ['blue']
+	assert contacts.tracks.get('blue')['endpoint'] == '127.0.0.1:4242:udp'
+	assert contacts.expire(iso2epoch(event.stale)) == []
+	assert contacts.expire(iso2epoch(event.stale) + 1) == ['blue']
+	assert contacts.contacts == {} and contacts.stale == {}
+	assert len(contacts.tracks) == 0 and contacts.index.positions == {}
+
+	# listener updates expire through the heap, expire() through the stale column
+	contacts.pli_listener(blue_force('old', stale=1), ('127.0.0.1', 4242))
+	contacts.pli_listener(blue_force('new'), ('127.0.0.1', 4242))
+	assert list(contacts.contacts) == ['new'] and 'old' not in contacts.tracks
+	assert contacts.expired == 2